@@ -1,6 +1,7 @@
 # AI Analyzer - Simplified Version
 import pandas as pd
 import numpy as np
+from indicators import ensure_indicators
 
 class AIAnalyzer:
     def __init__(self):
@@ -24,8 +25,7 @@ class AIAnalyzer:
         if len(df) < 50:
             return "NEUTRAL"
         
-        if 'RSI' not in df.columns or 'MACD' not in df.columns:
-            return "NEUTRAL"
+        df = ensure_indicators(df, ['RSI', 'MACD'])
         
         latest_rsi = df['RSI'].iloc[-1] if not pd.isna(df['RSI'].iloc[-1]) else 50
         latest_macd = df['MACD'].iloc[-1] if not pd.isna(df['MACD'].iloc[-1]) else 0
@@ -0,0 +1,145 @@
+"""
+=======================================================
+Backfill Engine - Paginated Historical Candle Loader
+Concurrent, rate-limited and resumable
+=======================================================
+"""
+
+import os
+import json
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import config
+from candle_store import CandleStore
+from market_data import KLINES_WEIGHT
+
+# Binance returns at most 1000 candles per klines request
+PAGE_LIMIT = 1000
+
+
+class Backfiller:
+    """Pages through exchange history with `since` cursors into the candle store."""
+
+    def __init__(self, client, max_workers=4):
+        self.client = client
+        self.exchange = client.exchange
+        self.store = client.store or CandleStore(config.CANDLE_STORE_DIR)
+        self.max_workers = max_workers
+        self._checkpoint_lock = threading.Lock()
+
+    def _checkpoint_path(self, symbol, timeframe):
+        safe_symbol = symbol.replace('/', '_').replace(':', '_')
+        return os.path.join(self.store.base_dir, f"{safe_symbol}_{timeframe}.backfill.json")
+
+    def _load_checkpoint(self, symbol, timeframe):
+        """
+        Returns {page start timestamp: candles stored for it} for the pages already complete.
+        Checkpoints written before counts were recorded map to None.
+        """
+        path = self._checkpoint_path(symbol, timeframe)
+        try:
+            with open(path, 'r') as f:
+                done = json.load(f).get('done', [])
+        except (OSError, ValueError):
+            return {}
+        if isinstance(done, list):
+            return {int(p): None for p in done}
+        return {int(p): n for p, n in done.items()}
+
+    def _verified_pages(self, symbol, timeframe, done_pages, page_ms, tf_ms):
+        """
+        Checkpointed pages the store still fully holds. A deleted, recreated or truncated
+        store file makes the checkpoint stale, so every page is checked against the candles
+        actually stored in it: at least as many as were written (any, for old checkpoints).
+        """
+        if not done_pages:
+            return {}
+        starts = np.array(sorted(done_pages), dtype=np.int64)
+        ts = self.store.read_records(symbol, timeframe, since=int(starts[0]),
+                                     until=int(starts[-1]) + page_ms - tf_ms)['timestamp']
+        stored = np.searchsorted(ts, starts + page_ms, side='left') - np.searchsorted(ts, starts, side='left')
+        verified = {}
+        for p, count in zip(starts.tolist(), stored.tolist()):
+            expected = done_pages[p]
+            if count >= (1 if expected is None else expected):
+                verified[p] = expected if expected is not None else count
+        return verified
+
+    def _save_checkpoint(self, symbol, timeframe, done_pages):
+        path = self._checkpoint_path(symbol, timeframe)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'done': {str(p): n for p, n in sorted(done_pages.items())}}, f)
+        os.replace(tmp_path, path)
+
+    def _fetch_page(self, symbol, timeframe, since):
+        self.client.pacer.wait(KLINES_WEIGHT)
+        return self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=PAGE_LIMIT)
+
+    def backfill(self, symbol, timeframe, since, until=None):
+        """
+        Makes sure the store covers [since, until] (epoch ms) for symbol/timeframe.
+        Pages are aligned to a fixed grid so completed pages can be skipped on the next run.
+        Returns the number of candles fetched.
+        """
+        tf_ms = self.exchange.parse_timeframe(timeframe) * 1000
+        page_ms = PAGE_LIMIT * tf_ms
+        now = self.exchange.milliseconds()
+        until = min(until or now, now)
+
+        # A page is final once every candle in it has closed
+        last_closed = (now // tf_ms) * tf_ms
+
+        first_page = (since // page_ms) * page_ms
+        pages = list(range(first_page, until + 1, page_ms))
+
+        done_pages = self._verified_pages(symbol, timeframe, self._load_checkpoint(symbol, timeframe), page_ms, tf_ms)
+        todo = [p for p in pages if p not in done_pages]
+        if not todo:
+            return 0
+
+        print(f"📥 Backfilling {symbol} {timeframe}: {len(todo)}/{len(pages)} pages to fetch...")
+
+        fetched = 0
+        failed = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self._fetch_page, symbol, timeframe, p): p for p in todo}
+            for future in as_completed(futures):
+                page_start = futures[future]
+                try:
+                    ohlcv = future.result()
+                except Exception as e:
+                    print(f"⚠️ Backfill page {page_start} failed for {symbol}: {e}")
+                    failed += 1
+                    continue
+
+                # Drop candles spilling into the next page (exchanges may ignore the limit)
+                ohlcv = [c for c in (ohlcv or []) if c[0] < page_start + page_ms]
+                self.store.merge(symbol, timeframe, ohlcv)
+                fetched += len(ohlcv)
+
+                if page_start + page_ms <= last_closed:
+                    with self._checkpoint_lock:
+                        done_pages[page_start] = len(ohlcv)
+                        self._save_checkpoint(symbol, timeframe, done_pages)
+
+        if failed:
+            print(f"⚠️ {failed} pages failed for {symbol}. Run the backfill again to resume.")
+        else:
+            print(f"✅ Backfill complete for {symbol} {timeframe} ({fetched} candles)")
+        return fetched
+
+
+if __name__ == "__main__":
+    import sys
+    from market_data import BinanceClient
+
+    symbol = sys.argv[1] if len(sys.argv) > 1 else 'BTC/USDT'
+    timeframe = sys.argv[2] if len(sys.argv) > 2 else '1h'
+    days = int(sys.argv[3]) if len(sys.argv) > 3 else 365
+
+    client = BinanceClient()
+    backfiller = Backfiller(client)
+    since = client.exchange.milliseconds() - days * 86400 * 1000
+    backfiller.backfill(symbol, timeframe, since)
@@ -0,0 +1,105 @@
+"""
+=======================================================
+Backtest Engine - Array-based Trade Simulation
+Entries from signal arrays, exits found with NumPy searches
+over high/low (no per-bar Python state machine)
+=======================================================
+"""
+
+import numpy as np
+
+LONG, SHORT = 1, -1
+SL, TP = 0, 1
+EXIT_REASONS = np.array(['SL', 'TP'])
+
+
+def signal_direction(signal):
+    """'BUY'/'SELL'/'NEUTRAL' array -> +1/-1/0 (int8)."""
+    signal = np.asarray(signal)
+    return np.where(signal == 'BUY', LONG, np.where(signal == 'SELL', SHORT, 0)).astype(np.int8)
+
+
+def first_exit(high, low, start, direction, stop_loss, take_profit):
+    """
+    First bar >= start where the stop or the target is touched.
+    The stop wins when both are touched in the same bar (same order as the old loop).
+    Returns (bar index, SL|TP) or (-1, -1) if the position is still open at the end.
+    Searches in doubling windows, so short trades only look at a few bars.
+    """
+    n = len(high)
+    pos, window = start, 64
+    while pos < n:
+        end = min(n, pos + window)
+        if direction == LONG:
+            sl_hit = low[pos:end] <= stop_loss
+            tp_hit = high[pos:end] >= take_profit
+        else:
+            sl_hit = high[pos:end] >= stop_loss
+            tp_hit = low[pos:end] <= take_profit
+        hit = sl_hit | tp_hit
+        if hit.any():
+            k = int(hit.argmax())
+            return pos + k, SL if sl_hit[k] else TP
+        pos, window = end, window * 2
+    return -1, -1
+
+
+def simulate(high, low, close, direction, entry, stop_loss, take_profit,
+             start=200, initial_capital=10000, position_fraction=0.10):
+    """
+    One position at a time: a signal on bar i (while flat) opens at entry[i] with
+    position_fraction of the current capital; from bar i+1 on the first SL/TP touch closes it,
+    and a signal on that exit bar may open the next trade.
+
+    Returns (trades, equity):
+      trades: dict of arrays (entry_index, exit_index, direction, entry, exit, size, pnl, exit_reason)
+      equity: initial capital followed by the marked-to-market equity of every bar from start
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    direction = np.asarray(direction)
+    n = len(close)
+
+    candidates = np.flatnonzero(direction[start:] != 0) + start
+    columns = {name: [] for name in ('entry_index', 'exit_index', 'direction', 'entry', 'exit', 'size', 'pnl', 'exit_reason')}
+    realized = np.zeros(n)      # pnl booked on its exit bar
+    unrealized = np.zeros(n)    # mark-to-market of the open position
+    capital = float(initial_capital)
+
+    i = start
+    while True:
+        c = np.searchsorted(candidates, i)
+        if c == len(candidates):
+            break
+        k = candidates[c]
+        side = int(direction[k])
+        price = entry[k]
+        size = capital * position_fraction / close[k]
+
+        j, reason = first_exit(high, low, k + 1, side, stop_loss[k], take_profit[k])
+        stop = n if j < 0 else j
+        unrealized[k:stop] += side * (close[k:stop] - price) * size
+        if j < 0:
+            break
+
+        exit_price = stop_loss[k] if reason == SL else take_profit[k]
+        pnl = side * (exit_price - price) * size
+        capital += pnl
+        realized[j] += pnl
+        for name, value in zip(columns, (k, j, side, price, exit_price, size, pnl, reason)):
+            columns[name].append(value)
+        i = j
+
+    trades = {
+        'entry_index': np.array(columns['entry_index'], dtype=np.int64),
+        'exit_index': np.array(columns['exit_index'], dtype=np.int64),
+        'direction': np.array(columns['direction'], dtype=np.int8),
+        'entry': np.array(columns['entry'], dtype=float),
+        'exit': np.array(columns['exit'], dtype=float),
+        'size': np.array(columns['size'], dtype=float),
+        'pnl': np.array(columns['pnl'], dtype=float),
+        'exit_reason': EXIT_REASONS[np.array(columns['exit_reason'], dtype=np.int64)],
+    }
+    equity = np.concatenate(([float(initial_capital)], initial_capital + np.cumsum(realized)[start:] + unrealized[start:]))
+    return trades, equity
@@ -10,23 +10,119 @@ import numpy as np
 from datetime import datetime, timedelta
 from market_data import BinanceClient
 from strategy import Strategy
+from backfill import Backfiller
+from candles import as_frame
+from backtest_engine import simulate, signal_direction, LONG
 import config
 
+
+def backtest_signals(df, signals, initial_capital=10000, start=200, stop=None):
+    """
+    Simulates generate_signals output on the bars [start, stop) of df.
+    Returns (trades, equity_curve) in the run_backtest format.
+    """
+    stop = len(df) if stop is None else stop
+    result, equity = simulate(
+        df['high'].to_numpy()[:stop], df['low'].to_numpy()[:stop], df['close'].to_numpy()[:stop],
+        signal_direction(signals['signal'].to_numpy()[:stop]),
+        signals['entry'].to_numpy()[:stop], signals['stop_loss'].to_numpy()[:stop], signals['take_profit'].to_numpy()[:stop],
+        start=start, initial_capital=initial_capital,
+    )
+
+    entry_times = df['timestamp'].iloc[result['entry_index']].tolist()
+    exit_times = df['timestamp'].iloc[result['exit_index']].tolist()
+    trades = [
+        {
+            'entry_time': entry_time,
+            'exit_time': exit_time,
+            'type': 'BUY' if side == LONG else 'SELL',
+            'entry': entry,
+            'exit': exit_price,
+            'pnl': pnl,
+            'exit_reason': reason,
+        }
+        for entry_time, exit_time, side, entry, exit_price, pnl, reason in zip(
+            entry_times, exit_times, result['direction'],
+            result['entry'], result['exit'], result['pnl'], result['exit_reason'],
+        )
+    ]
+    return trades, equity.tolist()
+
+
+def calculate_metrics(trades, equity_curve, initial_capital=10000):
+    """Performance metrics of a trade log and its equity curve."""
+    if not trades:
+        return {
+            'total_trades': 0,
+            'winning_trades': 0,
+            'losing_trades': 0,
+            'win_rate': 0,
+            'profit_factor': 0,
+            'max_drawdown': 0,
+            'total_pnl': 0,
+            'avg_win': 0,
+            'avg_loss': 0,
+            'final_capital': initial_capital,
+            'return_pct': 0
+        }
+
+    trades_df = pd.DataFrame(trades)
+
+    # Basic Stats
+    total_trades = len(trades_df)
+    winning_trades = trades_df[trades_df['pnl'] > 0]
+    losing_trades = trades_df[trades_df['pnl'] < 0]
+
+    win_rate = (len(winning_trades) / total_trades * 100) if total_trades > 0 else 0
+
+    total_wins = winning_trades['pnl'].sum() if len(winning_trades) > 0 else 0
+    total_losses = abs(losing_trades['pnl'].sum()) if len(losing_trades) > 0 else 0
+
+    profit_factor = (total_wins / total_losses) if total_losses > 0 else 0
+
+    # Max Drawdown
+    equity_series = pd.Series(equity_curve)
+    running_max = equity_series.expanding().max()
+    drawdown = (equity_series - running_max) / running_max * 100
+    max_drawdown = drawdown.min()
+
+    total_pnl = trades_df['pnl'].sum()
+    avg_win = winning_trades['pnl'].mean() if len(winning_trades) > 0 else 0
+    avg_loss = losing_trades['pnl'].mean() if len(losing_trades) > 0 else 0
+
+    return {
+        'total_trades': total_trades,
+        'winning_trades': len(winning_trades),
+        'losing_trades': len(losing_trades),
+        'win_rate': round(win_rate, 2),
+        'profit_factor': round(profit_factor, 2),
+        'max_drawdown': round(max_drawdown, 2),
+        'total_pnl': round(total_pnl, 2),
+        'avg_win': round(avg_win, 2),
+        'avg_loss': round(avg_loss, 2),
+        'final_capital': round(equity_curve[-1], 2),
+        'return_pct': round((equity_curve[-1] - initial_capital) / initial_capital * 100, 2)
+    }
+
+
 class Backtester:
     def __init__(self, initial_capital=10000):
         self.initial_capital = initial_capital
         self.client = BinanceClient()
         self.strategy = Strategy()
+        self.backfiller = Backfiller(self.client)
         
-    def load_historical_data(self, symbol, days=365):
+    def load_historical_data(self, symbol, days=365, timeframe='1h'):
         """
         Load historical data for backtesting.
+        Pages through the full history (the exchange caps each request at 1000 candles)
+        and caches it in the candle store, so reruns only fetch what is missing.
         """
         print(f"📥 Loading {days} days of historical data for {symbol}...")
         
-        # Fetch data (approx 24 candles per day for 1h timeframe)
-        limit = days * 24
-        df = self.client.fetch_data(symbol, '1h', limit)
+        since = self.client.exchange.milliseconds() - days * 86400 * 1000
+        self.backfiller.backfill(symbol, timeframe, since)
+        df = self.backfiller.store.read(symbol, timeframe, since=since)
         
         if df is None or df.empty:
             print(f"❌ Failed to load data for {symbol}")
@@ -37,186 +133,66 @@ class Backtester:
     
     def run_backtest(self, symbol, df, df_mtf=None):
         """
-        Run backtest on historical data.
+        Run backtest on historical data (DataFrame or Candles).
         Returns trade log and equity curve.
         """
+        df = as_frame(df)
         print(f"\n🚀 Starting Backtest for {symbol}...")
         print("="*50)
         
-        # Apply indicators
+        # Apply indicators and evaluate the strategy on every bar at once
         df = self.strategy.apply_indicators(df)
-        
-        # Initialize tracking
-        trades = []
-        equity_curve = [self.initial_capital]
-        current_capital = self.initial_capital
-        position = None  # {type, entry, sl, tp, size}
-        
-        # Simulate trading
-        for i in range(200, len(df)):  # Start after indicator warmup
-            current_bar = df.iloc[i]
-            current_price = current_bar['close']
-            timestamp = current_bar['timestamp']
-            
-            # Check if we have an open position
-            if position:
-                # Check Stop Loss
-                if position['type'] == 'LONG' and current_bar['low'] <= position['sl']:
-                    # SL Hit
-                    exit_price = position['sl']
-                    pnl = (exit_price - position['entry']) * position['size']
-                    current_capital += pnl
-                    
-                    trades.append({
-                        'entry_time': position['entry_time'],
-                        'exit_time': timestamp,
-                        'type': position['type'],
-                        'entry': position['entry'],
-                        'exit': exit_price,
-                        'pnl': pnl,
-                        'exit_reason': 'SL'
-                    })
-                    position = None
-                    
-                elif position['type'] == 'SELL' and current_bar['high'] >= position['sl']:
-                    # SL Hit
-                    exit_price = position['sl']
-                    pnl = (position['entry'] - exit_price) * position['size']
-                    current_capital += pnl
-                    
-                    trades.append({
-                        'entry_time': position['entry_time'],
-                        'exit_time': timestamp,
-                        'type': position['type'],
-                        'entry': position['entry'],
-                        'exit': exit_price,
-                        'pnl': pnl,
-                        'exit_reason': 'SL'
-                    })
-                    position = None
-                
-                # Check Take Profit
-                elif position['type'] == 'LONG' and current_bar['high'] >= position['tp']:
-                    # TP Hit
-                    exit_price = position['tp']
-                    pnl = (exit_price - position['entry']) * position['size']
-                    current_capital += pnl
-                    
-                    trades.append({
-                        'entry_time': position['entry_time'],
-                        'exit_time': timestamp,
-                        'type': position['type'],
-                        'entry': position['entry'],
-                        'exit': exit_price,
-                        'pnl': pnl,
-                        'exit_reason': 'TP'
-                    })
-                    position = None
-                    
-                elif position['type'] == 'SELL' and current_bar['low'] <= position['tp']:
-                    # TP Hit
-                    exit_price = position['tp']
-                    pnl = (position['entry'] - exit_price) * position['size']
-                    current_capital += pnl
-                    
-                    trades.append({
-                        'entry_time': position['entry_time'],
-                        'exit_time': timestamp,
-                        'type': position['type'],
-                        'entry': position['entry'],
-                        'exit': exit_price,
-                        'pnl': pnl,
-                        'exit_reason': 'TP'
-                    })
-                    position = None
-            
-            # If no position, check for new signals
-            if not position:
-                signal, setup = self.strategy.check_signal(df.iloc[:i+1], df_mtf)
-                
-                if signal in ['BUY', 'SELL'] and setup:
-                    # Calculate position size (simple: 10% of capital per trade)
-                    risk_per_trade = current_capital * 0.10
-                    position_size = risk_per_trade / current_price
-                    
-                    position = {
-                        'type': signal,
-                        'entry': setup['entry'],
-                        'sl': setup['stop_loss'],
-                        'tp': setup['take_profit'],
-                        'size': position_size,
-                        'entry_time': timestamp
-                    }
-            
-            # Track equity
-            if position:
-                # Mark-to-market
-                if position['type'] == 'LONG':
-                    unrealized_pnl = (current_price - position['entry']) * position['size']
-                else:
-                    unrealized_pnl = (position['entry'] - current_price) * position['size']
-                equity_curve.append(current_capital + unrealized_pnl)
-            else:
-                equity_curve.append(current_capital)
-        
-        return trades, equity_curve
+        signals = self.strategy.generate_signals(df, df_mtf)
+        # Simulate trading on the arrays (starts after the indicator warmup)
+        return backtest_signals(df, signals, self.initial_capital)
     
     def calculate_metrics(self, trades, equity_curve):
         """
         Calculate performance metrics.
         """
-        if not trades:
-            return {
-                'total_trades': 0,
-                'winning_trades': 0,
-                'losing_trades': 0,
-                'win_rate': 0,
-                'profit_factor': 0,
-                'max_drawdown': 0,
-                'total_pnl': 0,
-                'avg_win': 0,
-                'avg_loss': 0,
-                'final_capital': self.initial_capital,
-                'return_pct': 0
-            }
-        
-        trades_df = pd.DataFrame(trades)
-        
-        # Basic Stats
-        total_trades = len(trades_df)
-        winning_trades = trades_df[trades_df['pnl'] > 0]
-        losing_trades = trades_df[trades_df['pnl'] < 0]
-        
-        win_rate = (len(winning_trades) / total_trades * 100) if total_trades > 0 else 0
-        
-        total_wins = winning_trades['pnl'].sum() if len(winning_trades) > 0 else 0
-        total_losses = abs(losing_trades['pnl'].sum()) if len(losing_trades) > 0 else 0
-        
-        profit_factor = (total_wins / total_losses) if total_losses > 0 else 0
-        
-        # Max Drawdown
-        equity_series = pd.Series(equity_curve)
-        running_max = equity_series.expanding().max()
-        drawdown = (equity_series - running_max) / running_max * 100
-        max_drawdown = drawdown.min()
-        
-        total_pnl = trades_df['pnl'].sum()
-        avg_win = winning_trades['pnl'].mean() if len(winning_trades) > 0 else 0
-        avg_loss = losing_trades['pnl'].mean() if len(losing_trades) > 0 else 0
-        
-        return {
-            'total_trades': total_trades,
-            'winning_trades': len(winning_trades),
-            'losing_trades': len(losing_trades),
-            'win_rate': round(win_rate, 2),
-            'profit_factor': round(profit_factor, 2),
-            'max_drawdown': round(max_drawdown, 2),
-            'total_pnl': round(total_pnl, 2),
-            'avg_win': round(avg_win, 2),
-            'avg_loss': round(avg_loss, 2),
-            'final_capital': round(equity_curve[-1], 2),
-            'return_pct': round((equity_curve[-1] - self.initial_capital) / self.initial_capital * 100, 2)
-        }
+        return calculate_metrics(trades, equity_curve, self.initial_capital)
+    
+    def run_portfolio_backtest(self, symbols=None, days=365, timeframe=None, frames=None):
+        """
+        Backtest of all pairs together with the production risk rules
+        (see portfolio_backtest.run_portfolio_backtest). Loads history unless frames are given.
+        """
+        from portfolio_backtest import run_portfolio_backtest
+        symbols = symbols or config.TARGET_PAIRS
+        timeframe = timeframe or config.TIMEFRAME
+        if frames is None:
+            frames = {symbol: self.load_historical_data(symbol, days=days, timeframe=timeframe) for symbol in symbols}
+
+        print(f"\n🚀 Starting Portfolio Backtest for {len(frames)} pairs...")
+        print("="*50)
+        result = run_portfolio_backtest(frames, self.strategy, initial_capital=self.initial_capital)
+        print(f"⛔ Signals blocked by risk limits: {result['rejected']}")
+        return result
+    
+    def optimize(self, symbol, df, space, method='grid', n_iter=100, sort_by='return_pct', **kwargs):
+        """
+        Parallel parameter sweep (see optimizer.sweep).
+        Returns the ranked table of calculate_metrics outputs.
+        """
+        from optimizer import sweep
+        print(f"\n🔬 Optimizing {symbol} ({method} search)...")
+        table = sweep(df, space, method=method, n_iter=n_iter, initial_capital=self.initial_capital,
+                      sort_by=sort_by, **kwargs)
+        print(f"✅ {len(table)} parameter sets tested")
+        return table
+    
+    def walk_forward(self, symbol, df, space, train_bars, test_bars, anchored=False, **kwargs):
+        """
+        Walk-forward optimization (see optimizer.walk_forward).
+        Returns per-window parameters/metrics and the stitched out-of-sample equity.
+        """
+        from optimizer import walk_forward
+        mode = "anchored" if anchored else "rolling"
+        print(f"\n🔁 Walk-forward ({mode}) for {symbol}: train {train_bars} / test {test_bars} bars...")
+        report = walk_forward(df, space, train_bars, test_bars, anchored=anchored,
+                              initial_capital=self.initial_capital, **kwargs)
+        print(f"✅ {len(report['windows'])} windows, out-of-sample return: {report['metrics']['return_pct']}%")
+        return report
     
     def print_results(self, metrics):
         """
@@ -2,12 +2,15 @@ import ccxt.async_support as ccxt
 import asyncio
 import time
 import json
-import pandas as pd
 from loguru import logger
 from config import config
 from scanner import MarketScanner
 from messenger import messenger
 from charter import ChartGenerator
+from price_board import PriceBoard
+from candles import Candles
+from rate_limiter import install_rate_limiter
+from market_cache import ensure_markets_async
 
 # Simple Logger Setup
 logger.add("trading.log", rotation="500 MB")
@@ -35,7 +38,9 @@ class TradingBot:
             'secret': config.SECRET_KEY,
             'enableRateLimit': True,
         })
+        install_rate_limiter(self.exchange)
         self.scanner = MarketScanner(self.exchange)
+        self.price_board = PriceBoard(self.exchange)
         self.messenger = messenger
         self.charter = ChartGenerator()
         self.positions = {} 
@@ -237,7 +242,7 @@ class TradingBot:
     async def display_market_overview(self, chat_id=None):
         try:
             major_symbols = ['BTC/USDT', 'ETH/USDT', 'SOL/USDT', 'BNB/USDT', 'XRP/USDT', 'ADA/USDT']
-            tickers = await self.exchange.fetch_tickers(major_symbols)
+            tickers = await self.price_board.get_tickers(major_symbols)
             msg = "🌐 *ملخص أهم عملات السوق (24 ساعة)*:\n\n"
             total_change = 0
             count = 0
@@ -264,7 +269,7 @@ class TradingBot:
     async def display_hot_coins(self, chat_id=None):
         try:
             active_list = ['SOL/USDT', 'BNB/USDT', 'ADA/USDT', 'XRP/USDT', 'DOT/USDT', 'DOGE/USDT', 'LINK/USDT', 'MATIC/USDT']
-            tickers = await self.exchange.fetch_tickers(active_list)
+            tickers = await self.price_board.get_tickers(active_list)
             sorted_by_vol = sorted(tickers.items(), key=lambda x: x[1]['quoteVolume'] or 0, reverse=True)
             msg = "🔥 *العملات الأكثر نشاطاً حالياً*:\n\n"
             for sym, tick in sorted_by_vol[:4]:
@@ -281,7 +286,7 @@ class TradingBot:
         """عرض خريطة السوق البصرية (Emojis) لمعرفة الحالة العامة فوراً."""
         try:
             active_list = ['BTC/USDT', 'ETH/USDT', 'SOL/USDT', 'BNB/USDT', 'XRP/USDT', 'ADA/USDT', 'AVAX/USDT', 'DOT/USDT', 'LINK/USDT']
-            tickers = await self.exchange.fetch_tickers(active_list)
+            tickers = await self.price_board.get_tickers(active_list)
             
             msg = "🗺️ *خريطة مشاعر السوق (24h)*:\n\n"
             grid = ""
@@ -463,8 +468,8 @@ class TradingBot:
         """نظام إدارة مخاطر احترافي: Break-Even, Multi-TP, Trailing Stop."""
         for symbol, data in list(self.positions.items()):
             try:
-                ticker = await self.exchange.fetch_ticker(symbol)
-                current_price = ticker['last']
+                current_price = self.price_board.last(symbol)
+                if current_price is None: continue
                 
                 # 1. تحديث أعلى سعر
                 if current_price > data['highest_price']:
@@ -514,8 +519,7 @@ class TradingBot:
     async def fetch_data(self, symbol, timeframe='1h', limit=100):
         try:
             bars = await self.exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
-            df = pd.DataFrame(bars, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            return df
+            return Candles.from_ohlcv(bars, symbol, timeframe)
         except Exception as e:
             logger.error(f"Fetch Data Error ({symbol}): {e}")
             return None
@@ -544,8 +548,7 @@ class TradingBot:
                 size_p += bonus
                 logger.info(f"💰 Auto-Compounding: Increased order size to {size_p:.1f}% due to profits.")
 
-            ticker = await self.exchange.fetch_ticker(symbol)
-            price = ticker['last']
+            price = await self.price_board.get_price(symbol)
             msg = (
                 f"🔔 *تنفيذ عملية ذكية*\n\n"
                 f"📦 *النوع*: `{'شراء 🟢' if signal == 'buy' else 'بيع 🔴'}`\n"
@@ -593,8 +596,7 @@ class TradingBot:
             target_price = float(parts[2])
             
             # جلب السعر الحالي لتحديد الاتجاه
-            ticker = await self.exchange.fetch_ticker(symbol)
-            current_price = ticker['last']
+            current_price = await self.price_board.get_price(symbol)
             direction = 'above' if target_price > current_price else 'below'
             
             # حفظ التنبيه مع Chat ID الخاص بصحابه
@@ -628,8 +630,8 @@ class TradingBot:
         """التحقق من المنبهات بشكل دوري."""
         for alert in self.alerts[:]:
             try:
-                ticker = await self.exchange.fetch_ticker(alert['symbol'])
-                current = ticker['last']
+                current = self.price_board.last(alert['symbol'])
+                if current is None: continue
                 
                 hit = False
                 if alert['direction'] == 'above' and current >= alert['price']: hit = True
@@ -651,8 +653,8 @@ class TradingBot:
         for symbol in active_symbols:
             try:
                 pos = self.positions[symbol]
-                ticker = await self.exchange.fetch_ticker(symbol)
-                current_price = ticker['last']
+                current_price = self.price_board.last(symbol)
+                if current_price is None: continue
                 
                 # تحديث أعلى سعر وصل له السعر منذ الدخول
                 if current_price > pos['highest_price']:
@@ -677,6 +679,10 @@ class TradingBot:
             except Exception as e:
                 logger.error(f"Trailing Stop Error ({symbol}): {e}")
 
+    def watched_symbols(self):
+        """كل العملات التي نحتاج سعرها في كل دورة (الصفقات المفتوحة + المنبهات)."""
+        return list(self.positions.keys()) + [a['symbol'] for a in self.alerts]
+
     async def run_loop(self):
         logger.info("Starting Async Main Loop...")
         await self.messenger.send_message(
@@ -698,6 +704,8 @@ class TradingBot:
 
                 # المهام المتوازية
                 await self.check_commands()
+                # تحديث جميع الأسعار بطلب واحد فقط لكل دورة
+                await self.price_board.refresh(self.watched_symbols())
                 await self.check_trailing_stop()
                 await self.check_alerts()
                 
@@ -717,6 +725,10 @@ class TradingBot:
 
     async def start(self):
         try:
+            try:
+                await ensure_markets_async(self.exchange)
+            except Exception as e:
+                logger.warning(f"Could not load markets: {e}")
             await self.run_loop()
         finally:
             await self.exchange.close()
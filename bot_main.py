@@ -1,116 +1,230 @@
 import time
+import asyncio
 import config
 from market_data import BinanceClient
+from resampler import Resampler, resample, base_limit
 from strategy import Strategy
+from indicator_engine import IndicatorEngine
 import db_manager as database
 import telegram_bot
 from risk_manager import RiskManager
 from trade_executor import TradeExecutor
 import sys
 
+def analyze_symbol(symbol, df, df_4h, strategy, risk_manager, executor, engine=None):
+    """
+    Runs the strategy on one symbol and logs any new signal as PENDING.
+    With an IndicatorEngine only new/revised candles are computed.
+    Returns the latest price (or None if there is not enough data).
+    """
+    if df is not None and not df.empty and len(df) > 200:
+        latest_price = df.iloc[-1]['close']
+
+        # 2. Analyze
+        if engine is not None:
+            df = engine.sync(symbol, config.TIMEFRAME, df)
+        else:
+            df = strategy.apply_indicators(df)
+        signal, setup = strategy.check_signal(df, df_mtf=df_4h)
+
+        # 3. Output & Log Status
+        ema_200 = df.iloc[-1]['EMA_200']
+        rsi = df.iloc[-1]['RSI']
+        trend = "UP" if latest_price > ema_200 else "DOWN"
+
+        # Log to DB (For Dashboard)
+        database.update_market_status(symbol, latest_price, trend, rsi)
+
+        print(f"{symbol:<12} | {latest_price:<10.2f} | {trend:<10} | {signal:<10}")
+
+        # 4. Handle Trading Execution
+        if signal in ["BUY", "SELL"] and setup:
+            # Check if we already have a position
+            if symbol not in executor.active_positions:
+                # Risk Check
+                if risk_manager.can_open_position(len(executor.active_positions)):
+                    # Calculate Position Size
+                    size = risk_manager.calculate_position_size(setup['entry'], setup['stop_loss'])
+
+                    # Instead of auto-executing, log as PENDING
+                    # emoji = "🚀" if signal == "BUY" else "📉"
+                    # print(f"\n{emoji} {signal} ORDER EXECUTED: {symbol} at {setup['entry']}")
+
+                    # Log Signal as PENDING (Dashboard will handle approval)
+                    database.log_signal(symbol, signal, setup['entry'], setup['stop_loss'], setup['take_profit'], setup['reason'])
+                    telegram_bot.send_signal_alert(symbol, setup)
+                    print(f"📝 {signal} Signal logged as PENDING for {symbol}. Awaiting dashboard approval.")
+
+        return latest_price
+
+    print(f"{symbol:<12} | Waiting for data...")
+    return None
+
+def execute_approved_signals(risk_manager, executor):
+    """Checks for APPROVED signals in DB and executes them."""
+    approved_df = database.get_approved_signals()
+    if not approved_df.empty:
+        for _, row in approved_df.iterrows():
+            print(f"✅ Executing APPROVED signal for {row['symbol']}...")
+
+            # Re-calculate size based on current capital
+            size = risk_manager.calculate_position_size(row['price'], row['stop_loss'])
+
+            # Create a mock setup object for the executor
+            setup = {
+                'type': row['type'],
+                'entry': row['price'],
+                'stop_loss': row['stop_loss'],
+                'take_profit': row['take_profit']
+            }
+
+            # Execute
+            position = executor.open_position(row['symbol'], setup, size)
+
+            if position:
+                # Mark as EXECUTED
+                database.update_signal_status(row['id'], 'EXECUTED')
+                print(f"🚀 Trade executed and marked as EXECUTED in DB.")
+            else:
+                # Mark as FAILED (to prevent infinite loop)
+                database.update_signal_status(row['id'], 'FAILED')
+                print(f"❌ Trade failed to execute. Marked as FAILED.")
+            print(f"🚀 Trade executed and marked as EXECUTED in DB.")
+
+def run_polling(client, strategy, risk_manager, executor, engine=None):
+    """Classic mode: poll REST for every pair every 5 seconds."""
+    while True:
+        # Get current timestamp
+        now = time.strftime('%Y-%m-%d %H:%M:%S')
+        current_prices = {}
+
+        # 1. Fetch Data for all pairs concurrently
+        # The 4h MTF frame is aggregated from the same 1h candles (one request per pair)
+        limit = base_limit(config.TIMEFRAME, config.LIMIT, config.MTF_TIMEFRAME, config.MTF_LIMIT)
+        requests = [(symbol, config.TIMEFRAME, limit) for symbol in config.TARGET_PAIRS]
+
+        # Analyze each pair as soon as its data has arrived
+        for (symbol, _, _), df_base in client.fetch_many(requests):
+            df, df_4h = df_base, None
+            if df_base is not None and not df_base.empty:
+                df = df_base.tail(config.LIMIT).reset_index(drop=True)
+                df_4h = resample(df_base, config.MTF_TIMEFRAME).tail(config.MTF_LIMIT).reset_index(drop=True)
+
+            latest_price = analyze_symbol(symbol, df, df_4h, strategy, risk_manager, executor, engine)
+            if latest_price is not None:
+                current_prices[symbol] = latest_price
+
+        # 5. Check for APPROVED signals in DB to execute
+        execute_approved_signals(risk_manager, executor)
+
+        # 6. Check Active Positions (Trailing Stops)
+        executor.check_trailing_stops(current_prices)
+
+        print(f"\nWaiting 5s...")
+        time.sleep(5)
+
+async def run_streaming(client, strategy, risk_manager, executor, engine=None):
+    """
+    Streaming mode: closed candles from the kline stream drive the strategy,
+    every ticker update drives the trailing-stop check.
+    REST is only used to seed history and to resync after a reconnect.
+    """
+    from stream import BinanceStream
+
+    # Higher timeframe bars are built locally from the streamed base candles
+    mtf = Resampler(config.MTF_TIMEFRAME, max_bars=config.MTF_LIMIT)
+    limit = base_limit(config.TIMEFRAME, config.LIMIT, config.MTF_TIMEFRAME, config.MTF_LIMIT)
+
+    def sync_history():
+        # Tail fetch into the candle store (only what was missed), then reseed the MTF bars
+        for symbol in config.TARGET_PAIRS:
+            df_base = client.fetch_data(symbol, config.TIMEFRAME, limit)
+            if df_base is not None and not df_base.empty:
+                mtf.seed(symbol, df_base)
+
+    def process_candle(symbol, row):
+        mtf.update(symbol, row)
+        if client.store is not None:
+            client.store.merge(symbol, config.TIMEFRAME, [row])
+            df = client.store.read(symbol, config.TIMEFRAME, limit=config.LIMIT)
+        else:
+            df = client.fetch_data(symbol, config.TIMEFRAME, config.LIMIT)
+        # The higher timeframe only moves once per closed base candle
+        df_4h = mtf.frame(symbol, config.MTF_LIMIT)
+        analyze_symbol(symbol, df, df_4h, strategy, risk_manager, executor, engine)
+
+    # REST calls and the analysis run in a worker thread so the event loop keeps serving
+    # the socket; an error in one callback is logged instead of ending the stream.
+    # One trading step touches the executor at a time.
+    trading = asyncio.Lock()
+
+    async def on_reconnect():
+        try:
+            await asyncio.to_thread(sync_history)
+        except Exception as e:
+            print(f"⚠️ History sync failed: {e}")
+
+    async def on_candle(symbol, row, is_closed):
+        if not is_closed:
+            return
+        try:
+            async with trading:
+                await asyncio.to_thread(process_candle, symbol, row)
+        except Exception as e:
+            print(f"⚠️ Error processing {symbol} candle: {e}")
+
+    async def on_tick(symbol, price):
+        # Skipped while another step is trading; the next tick follows within a second
+        if symbol not in executor.active_positions or trading.locked():
+            return
+        try:
+            async with trading:
+                await asyncio.to_thread(executor.check_trailing_stops, {symbol: price})
+        except Exception as e:
+            print(f"⚠️ Trailing stop check failed for {symbol}: {e}")
+
+    async def approval_loop():
+        while True:
+            try:
+                async with trading:
+                    await asyncio.to_thread(execute_approved_signals, risk_manager, executor)
+            except Exception as e:
+                print(f"⚠️ Approval check failed: {e}")
+            await asyncio.sleep(5)
+
+    print(f"📡 Streaming mode via {config.STREAM_URL}")
+    stream = BinanceStream(config.TARGET_PAIRS, config.TIMEFRAME, config.STREAM_URL)
+    approvals = asyncio.create_task(approval_loop())
+    try:
+        # (Re)connect -> catch up on candles missed while disconnected
+        await stream.run(on_candle, on_tick, on_reconnect=on_reconnect)
+    finally:
+        approvals.cancel()
+
 def main():
     print("Starting Professional Binance Bot (Phase 3)...")
     print("Dashboard & Telegram Integration Active")
-    
+
     # Initialize DB
     database.init_db()
-    
+
     # Initialize Client and Strategy
     # Initialize Client, Strategy, and Risk/Executor
     client = BinanceClient()
     strategy = Strategy()
     risk_manager = RiskManager(initial_capital=config.TRADING_CAPITAL)
     executor = TradeExecutor(client)
-    
+    engine = IndicatorEngine(strategy, history=config.LIMIT)
+
     # Load Active Positions from DB
     executor.active_positions = database.get_active_positions()
     print(f"📂 Loaded {len(executor.active_positions)} active positions from database.")
-    
+
     try:
-        while True:
-            # Get current timestamp
-            now = time.strftime('%Y-%m-%d %H:%M:%S')
-            current_prices = {}
-
-            for symbol in config.TARGET_PAIRS:
-                # 1. Fetch Data (1h and 4h for MTF)
-                df = client.fetch_data(symbol, config.TIMEFRAME, config.LIMIT)
-                df_4h = client.fetch_data(symbol, '4h', 100) # Fetch 4h trend
-                
-                if df is not None and not df.empty and len(df) > 200:
-                    latest_price = df.iloc[-1]['close']
-                    current_prices[symbol] = latest_price
-                    
-                    # 2. Analyze
-                    df = strategy.apply_indicators(df)
-                    signal, setup = strategy.check_signal(df, df_mtf=df_4h)
-                    
-                    # 3. Output & Log Status
-                    ema_200 = df.iloc[-1]['EMA_200']
-                    rsi = df.iloc[-1]['RSI']
-                    trend = "UP" if latest_price > ema_200 else "DOWN"
-                    
-                    # Log to DB (For Dashboard)
-                    database.update_market_status(symbol, latest_price, trend, rsi)
-                    
-                    print(f"{symbol:<12} | {latest_price:<10.2f} | {trend:<10} | {signal:<10}")
-                    
-                    # 4. Handle Trading Execution
-                    if signal in ["BUY", "SELL"] and setup:
-                        # Check if we already have a position
-                        if symbol not in executor.active_positions:
-                            # Risk Check
-                            if risk_manager.can_open_position(len(executor.active_positions)):
-                                # Calculate Position Size
-                                size = risk_manager.calculate_position_size(setup['entry'], setup['stop_loss'])
-                                
-                                # Instead of auto-executing, log as PENDING
-                                # emoji = "🚀" if signal == "BUY" else "📉"
-                                # print(f"\n{emoji} {signal} ORDER EXECUTED: {symbol} at {setup['entry']}")
-                                
-                                # Log Signal as PENDING (Dashboard will handle approval)
-                                database.log_signal(symbol, signal, setup['entry'], setup['stop_loss'], setup['take_profit'], setup['reason'])
-                                telegram_bot.send_signal_alert(symbol, setup)
-                                print(f"📝 {signal} Signal logged as PENDING for {symbol}. Awaiting dashboard approval.")
-
-                else:
-                    print(f"{symbol:<12} | Waiting for data...")
-
-            # 5. Check for APPROVED signals in DB to execute
-            approved_df = database.get_approved_signals()
-            if not approved_df.empty:
-                for _, row in approved_df.iterrows():
-                    print(f"✅ Executing APPROVED signal for {row['symbol']}...")
-                    
-                    # Re-calculate size based on current capital
-                    size = risk_manager.calculate_position_size(row['price'], row['stop_loss'])
-                    
-                    # Create a mock setup object for the executor
-                    setup = {
-                        'type': row['type'],
-                        'entry': row['price'],
-                        'stop_loss': row['stop_loss'],
-                        'take_profit': row['take_profit']
-                    }
-                    
-                    # Execute
-                    position = executor.open_position(row['symbol'], setup, size)
-                    
-                    if position:
-                        # Mark as EXECUTED
-                        database.update_signal_status(row['id'], 'EXECUTED')
-                        print(f"🚀 Trade executed and marked as EXECUTED in DB.")
-                    else:
-                        # Mark as FAILED (to prevent infinite loop)
-                        database.update_signal_status(row['id'], 'FAILED')
-                        print(f"❌ Trade failed to execute. Marked as FAILED.")
-                    print(f"🚀 Trade executed and marked as EXECUTED in DB.")
-
-            # 6. Check Active Positions (Trailing Stops)
-            executor.check_trailing_stops(current_prices)
-
-            print(f"\nWaiting 5s...")
-            time.sleep(5) 
+        if config.STREAM_MODE:
+            asyncio.run(run_streaming(client, strategy, risk_manager, executor, engine))
+        else:
+            run_polling(client, strategy, risk_manager, executor, engine)
 
     except KeyboardInterrupt:
         print("\nBot stopped by user.")
@@ -0,0 +1,204 @@
+"""
+=======================================================
+Candle Store - Persistent OHLCV Cache
+Memory-mapped columnar storage per (symbol, timeframe)
+=======================================================
+"""
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    import msvcrt  # Windows (run_bot.bat / run_mcp_server.bat)
+    HAS_FCNTL = False
+
+# One fixed-width record per candle (48 bytes).
+# Files are plain arrays of this dtype, so they can be memory-mapped directly.
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+])
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+class CandleStore:
+    """On-disk candle cache keyed by (symbol, timeframe)."""
+
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+        os.makedirs(self.base_dir, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, symbol, timeframe):
+        safe_symbol = symbol.replace('/', '_').replace(':', '_')
+        return os.path.join(self.base_dir, f"{safe_symbol}_{timeframe}.bin")
+
+    @contextmanager
+    def _file_lock(self, path, shared=False):
+        """
+        Cross-process lock on a sidecar .lock file. The bot, dashboard and backtester are
+        separate processes sharing the store files: writers hold it exclusively while they
+        read the length and rewrite the data, readers hold it shared while a file is mapped
+        (on Windows a mapped file cannot be replaced). msvcrt has no shared mode, so on
+        Windows readers lock exclusively too.
+        """
+        with open(f"{path}.lock", 'a+b') as lock_file:
+            if HAS_FCNTL:
+                fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+                        break
+                    except OSError:
+                        time.sleep(0.01)
+            try:
+                yield
+            finally:
+                if HAS_FCNTL:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    @contextmanager
+    def _write_lock(self, path):
+        """Exclusive lock for rewriting one store file (threads of this process, then other processes)."""
+        with self._lock, self._file_lock(path):
+            yield
+
+    def _map(self, symbol, timeframe):
+        """Memory-map the stored records (read-only). Returns None if empty."""
+        path = self._path(symbol, timeframe)
+        if not os.path.exists(path):
+            return None
+        # Ignore a partially written trailing record (another process may be appending)
+        count = os.path.getsize(path) // RECORD_DTYPE.itemsize
+        if count == 0:
+            return None
+        return np.memmap(path, dtype=RECORD_DTYPE, mode='r', shape=(count,))
+
+    def count(self, symbol, timeframe):
+        with self._file_lock(self._path(symbol, timeframe), shared=True):
+            records = self._map(symbol, timeframe)
+            count = 0 if records is None else len(records)
+            del records
+        return count
+
+    def last_timestamp(self, symbol, timeframe):
+        """Epoch-ms timestamp of the newest stored candle, or None."""
+        with self._file_lock(self._path(symbol, timeframe), shared=True):
+            records = self._map(symbol, timeframe)
+            last_ts = None if records is None else int(records['timestamp'][-1])
+            del records
+        return last_ts
+
+    def first_timestamp(self, symbol, timeframe):
+        with self._file_lock(self._path(symbol, timeframe), shared=True):
+            records = self._map(symbol, timeframe)
+            first_ts = None if records is None else int(records['timestamp'][0])
+            del records
+        return first_ts
+
+    def read_records(self, symbol, timeframe, limit=None, since=None, until=None):
+        """Returns a copy of the stored records as a structured NumPy array."""
+        # The mapping is dropped before the lock is released, so a writer never replaces a mapped file
+        with self._file_lock(self._path(symbol, timeframe), shared=True):
+            records = self._map(symbol, timeframe)
+            if records is None:
+                return np.empty(0, dtype=RECORD_DTYPE)
+
+            ts = records['timestamp']
+            start = 0 if since is None else int(np.searchsorted(ts, since, side='left'))
+            end = len(records) if until is None else int(np.searchsorted(ts, until, side='right'))
+            if limit is not None:
+                start = max(start, end - limit)
+            out = np.array(records[start:end])
+            del ts, records
+        return out
+
+    def read(self, symbol, timeframe, limit=None, since=None, until=None):
+        """
+        Returns stored candles as a DataFrame in the same shape as fetch_data
+        (timestamp converted to datetime).
+        """
+        records = self.read_records(symbol, timeframe, limit=limit, since=since, until=until)
+        if len(records) == 0:
+            return None
+
+        df = pd.DataFrame({col: records[col] for col in OHLCV_COLUMNS})
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
+
+    def merge(self, symbol, timeframe, ohlcv):
+        """
+        Merge CCXT-style [[ts, o, h, l, c, v], ...] rows into the store.
+        Newer rows are appended; a row with the same timestamp replaces the stored one
+        (the still-open candle gets revised on every poll).
+        Returns the number of rows written.
+        """
+        if ohlcv is None or len(ohlcv) == 0:
+            return 0
+
+        rows = np.array([tuple(r[:6]) for r in ohlcv], dtype=RECORD_DTYPE)
+        rows = rows[np.argsort(rows['timestamp'], kind='stable')]
+        # Keep the last occurrence of duplicated timestamps
+        _, last_idx = np.unique(rows['timestamp'][::-1], return_index=True)
+        rows = rows[::-1][last_idx]
+
+        path = self._path(symbol, timeframe)
+        with self._write_lock(path):
+            # Length and data are read under the lock, so no other writer's rows are lost
+            records = self._map(symbol, timeframe)
+
+            if records is None:
+                self._write_all(path, rows)
+                return len(rows)
+
+            last_ts = int(records['timestamp'][-1])
+            first_new = int(rows['timestamp'][0])
+
+            # Fast path: rows only touch the tail (the common polling case)
+            if first_new >= last_ts:
+                count = len(records)
+                del records
+                with open(path, 'r+b') as f:
+                    offset = count if first_new > last_ts else count - 1
+                    f.seek(offset * RECORD_DTYPE.itemsize)
+                    f.write(rows.tobytes())
+                    f.truncate((offset + len(rows)) * RECORD_DTYPE.itemsize)
+                return len(rows)
+
+            # Slow path: rows overlap older history (backfills) -> full rewrite
+            merged = np.concatenate([np.array(records), rows])
+            del records
+            _, last_idx = np.unique(merged['timestamp'][::-1], return_index=True)
+            merged = merged[::-1][last_idx]
+            self._write_all(path, merged)
+            return len(rows)
+
+    def _write_all(self, path, records):
+        """Atomically replace a store file so readers never see a half-written file."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(records.tobytes())
+        os.replace(tmp_path, path)
+
+    def clear(self, symbol, timeframe):
+        path = self._path(symbol, timeframe)
+        with self._write_lock(path):
+            if os.path.exists(path):
+                os.remove(path)
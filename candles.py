@@ -0,0 +1,89 @@
+"""
+=======================================================
+Candles - Compact Array-backed OHLCV Container
+Contiguous NumPy columns instead of a DataFrame per symbol
+=======================================================
+"""
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class Candles:
+    """
+    OHLCV for one symbol/timeframe.
+    timestamp is int64 epoch ms; prices/volume are float64 or (optionally) float32.
+    Supports candles['close'], len(), tail() and to_frame() so it can stand in
+    for a fetch_data frame wherever only the columns are read.
+    """
+
+    __slots__ = ('symbol', 'timeframe', 'timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, timestamp, open, high, low, close, volume, symbol=None, timeframe=None, dtype=np.float64):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.timestamp = np.ascontiguousarray(timestamp, dtype=np.int64)
+        self.open = np.ascontiguousarray(open, dtype=dtype)
+        self.high = np.ascontiguousarray(high, dtype=dtype)
+        self.low = np.ascontiguousarray(low, dtype=dtype)
+        self.close = np.ascontiguousarray(close, dtype=dtype)
+        self.volume = np.ascontiguousarray(volume, dtype=dtype)
+
+    @classmethod
+    def from_ohlcv(cls, rows, symbol=None, timeframe=None, dtype=np.float64):
+        """From ccxt fetch_ohlcv output ([[ts, o, h, l, c, v], ...])."""
+        data = np.asarray(rows, dtype=np.float64).reshape(-1, 6)
+        return cls(data[:, 0], *data[:, 1:].T, symbol=symbol, timeframe=timeframe, dtype=dtype)
+
+    @classmethod
+    def from_records(cls, records, symbol=None, timeframe=None, dtype=np.float64):
+        """From CandleStore.read_records (structured array)."""
+        return cls(records['timestamp'], *(records[f] for f in FIELDS), symbol=symbol, timeframe=timeframe, dtype=dtype)
+
+    @classmethod
+    def from_frame(cls, df, symbol=None, timeframe=None, dtype=np.float64):
+        """From a fetch_data DataFrame (datetime or epoch-ms timestamps)."""
+        from resampler import to_epoch_ms
+        symbol = symbol or df.attrs.get('symbol')
+        timeframe = timeframe or df.attrs.get('timeframe')
+        return cls(to_epoch_ms(df['timestamp']), *(df[f].to_numpy() for f in FIELDS),
+                   symbol=symbol, timeframe=timeframe, dtype=dtype)
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def __getitem__(self, field):
+        if field not in self.__slots__[2:]:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    @property
+    def empty(self):
+        return len(self.timestamp) == 0
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, f).nbytes for f in ('timestamp',) + FIELDS)
+
+    def tail(self, n):
+        """Last n candles (views, no copy)."""
+        start = max(len(self) - n, 0)
+        return Candles(*(getattr(self, f)[start:] for f in ('timestamp',) + FIELDS),
+                       symbol=self.symbol, timeframe=self.timeframe, dtype=self.close.dtype)
+
+    def to_frame(self, as_datetime=False):
+        """DataFrame in the ccxt layout (float64), tagged for the indicator cache."""
+        df = pd.DataFrame({
+            'timestamp': pd.to_datetime(self.timestamp, unit='ms') if as_datetime else self.timestamp,
+            **{f: getattr(self, f).astype(np.float64, copy=False) for f in FIELDS},
+        })
+        if self.symbol and self.timeframe:
+            df.attrs = {'symbol': self.symbol, 'timeframe': self.timeframe}
+        return df
+
+
+def as_frame(data, as_datetime=True):
+    """Lets DataFrame-based code accept Candles as well."""
+    return data.to_frame(as_datetime=as_datetime) if isinstance(data, Candles) else data
@@ -1,6 +1,8 @@
 import pandas as pd
 import io
 from loguru import logger
+import indicators
+from candles import as_frame
 
 try:
     import mplfinance as mpf
@@ -21,18 +23,21 @@ class ChartGenerator:
         if not HAS_PLOT: return None
         try:
             # تجهيز البيانات
+            df = as_frame(df, as_datetime=False)
             df.index = pd.to_datetime(df['timestamp'], unit='ms')
             
             # مؤشرات فنية (Moving Averages)
             add_plots = []
             
-            if len(df) > 50:
-                ma50 = df['close'].rolling(window=50).mean()
-                add_plots.append(mpf.make_addplot(ma50, color='cyan', width=1.5, label='MA 50'))
+            # Only the averages that fit the data are computed
+            needed = [name for name, min_len in (('SMA_50', 50), ('SMA_200', 200)) if len(df) > min_len]
+            values = indicators.compute(df, needed)
             
-            if len(df) > 200:
-                ma200 = df['close'].rolling(window=200).mean()
-                add_plots.append(mpf.make_addplot(ma200, color='orange', width=1.5, label='MA 200'))
+            if 'SMA_50' in values:
+                add_plots.append(mpf.make_addplot(values['SMA_50'], color='cyan', width=1.5, label='MA 50'))
+            
+            if 'SMA_200' in values:
+                add_plots.append(mpf.make_addplot(values['SMA_200'], color='orange', width=1.5, label='MA 200'))
             
             # منع الرسم إذا لم تتوفر مؤشرات (لتفادي خطأ المصفوفة الفارغة)
             if not add_plots and len(df) < 50:
@@ -44,6 +44,11 @@ if BINANCE_USE_US:
 TARGET_PAIRS = ['PAXG/USDT', 'BTC/USDT', 'ETH/USDT', 'BNB/USDT', 'SOL/USDT', 'XRP/USDT', 'DOGE/USDT']
 TIMEFRAME = '1h'  # 1m, 5m, 15m, 1h, 4h, 1d
 LIMIT = 300       # Number of candles to fetch
+MTF_TIMEFRAME = '4h'  # Higher timeframe for trend bias (resampled from TIMEFRAME)
+MTF_LIMIT = 100       # Number of higher-timeframe candles used for the bias
+FETCH_WORKERS = int(get_config('FETCH_WORKERS', 8))  # Concurrent fetches in BinanceClient.fetch_many
+LEADERBOARD_LIMIT = int(get_config('LEADERBOARD_LIMIT', 300))  # Candles per symbol for the ranked leaderboard
+GOLD_TIMEFRAMES = ['15m', '1h', '4h', '1d']  # Timeframes merged in the gold confluence report
 
 # Telegram Settings
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN', 'YOUR_TOKEN')
@@ -61,3 +66,36 @@ MAX_POSITIONS = 3  # Maximum concurrent positions
 
 # Trading Capital
 TRADING_CAPITAL = 10000  # Starting capital for risk calculations
+
+# Candle Store (persistent OHLCV cache shared by bot, dashboard and backtester)
+CANDLE_STORE_ENABLED = str(get_config('CANDLE_STORE_ENABLED', 'True')).lower() == 'true'
+CANDLE_STORE_DIR = get_config('CANDLE_STORE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'candle_store'))
+
+# Streaming Mode (WebSocket klines/tickers instead of 5s REST polling)
+STREAM_MODE = str(get_config('STREAM_MODE', 'False')).lower() == 'true'
+# Point at a local replay server (python stream.py replay <file>) to test offline
+STREAM_URL = get_config('STREAM_URL', 'wss://stream.binance.us:9443' if BINANCE_USE_US else 'wss://stream.binance.com:9443')
+
+# Shared request scheduler (one token bucket for bot_main, bot, dashboard and mcp_server)
+RATE_LIMIT_ENABLED = str(get_config('RATE_LIMIT_ENABLED', 'True')).lower() == 'true'
+RATE_LIMIT_DB = get_config('RATE_LIMIT_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rate_limit.sqlite'))
+RATE_LIMIT_BACKOFF = int(get_config('RATE_LIMIT_BACKOFF', 10))  # seconds all processes pause after a 429/418
+
+# Market metadata cache (load_markets results kept on disk between restarts)
+MARKET_CACHE_ENABLED = str(get_config('MARKET_CACHE_ENABLED', 'True')).lower() == 'true'
+MARKET_CACHE_DIR = get_config('MARKET_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'market_cache'))
+MARKET_CACHE_TTL = int(get_config('MARKET_CACHE_TTL', 6 * 3600))  # seconds
+
+# Indicator cache (shared memoization of indicator frames, LRU)
+INDICATOR_CACHE_MB = int(get_config('INDICATOR_CACHE_MB', 64))
+
+# Multi-strategy runner (strategy_runner.py): strategy_id -> Strategy parameter overrides
+STRATEGY_VARIANTS = {
+    'default': {},
+    'tight_stop': {'atr_multiplier': 1.0},
+    'wide_target': {'risk_reward_ratio': 3.0},
+    'strict_volume': {'volume_spike_multiplier': 2.0},
+}
+
+# Backtest parameter sweeps / walk-forward (optimizer.py)
+SWEEP_WORKERS = int(get_config('SWEEP_WORKERS', 0))  # 0 = one worker per CPU core
@@ -15,6 +15,8 @@ import config
 from market_data import BinanceClient
 from strategy import Strategy
 from gold_analyzer import GoldAnalyzer
+from leaderboard import Leaderboard
+from gold_pipeline import GoldPipeline
 from backtester import Backtester
 from ai_analyzer import AIAnalyzer
 from risk_manager import RiskManager
@@ -44,9 +46,11 @@ try:
     @st.cache_resource
     def get_bot_components():
         """Initialize Client and Strategy once."""
-        return BinanceClient(), Strategy(), GoldAnalyzer(), AIAnalyzer(), Backtester(), RiskManager()
+        client, strategy, gold_analyzer = BinanceClient(), Strategy(), GoldAnalyzer()
+        return (client, strategy, gold_analyzer, AIAnalyzer(), Backtester(), RiskManager(), Leaderboard(),
+                GoldPipeline(client, strategy, gold_analyzer))
 
-    client, strategy, gold_analyzer, ai_analyzer, backtester, risk_manager = get_bot_components()
+    client, strategy, gold_analyzer, ai_analyzer, backtester, risk_manager, leaderboard, gold_pipeline = get_bot_components()
 except Exception as e:
     st.error(f"🚨 Critical Error during initialization: {e}")
     st.stop()
@@ -392,7 +396,11 @@ with st.sidebar:
 # --- Main Content Area ---
 # Fetch Data
 with st.spinner('🔄 جاري تحميل البيانات...'):
-    df_chart = client.fetch_data(selected_symbol, config.TIMEFRAME, 300)
+    # Fetch the selected asset and the gold tab data concurrently
+    fetched = {symbol: df for (symbol, _, _), df in client.fetch_many(
+        (symbol, config.TIMEFRAME, 300) for symbol in dict.fromkeys([selected_symbol, 'PAXG/USDT'])
+    )}
+    df_chart = fetched.get(selected_symbol)
     
     if df_chart is not None and not df_chart.empty:
         df_chart = strategy.apply_indicators(df_chart)
@@ -506,7 +514,7 @@ with tab3:
     """, unsafe_allow_html=True)
     
     # Fetch Gold Data
-    gold_df = client.fetch_data('PAXG/USDT', config.TIMEFRAME, 300)
+    gold_df = fetched.get('PAXG/USDT')
     if gold_df is not None and not gold_df.empty:
         gold_df = strategy.apply_indicators(gold_df)
         gold_analysis = gold_analyzer.get_full_analysis(gold_df)
@@ -646,6 +654,37 @@ with tab3:
     else:
         st.error("❌ فشل في جلب بيانات الذهب")
 
+    # === MULTI-TIMEFRAME CONFLUENCE (15m / 1h / 4h / 1d fetched concurrently) ===
+    st.markdown("---")
+    st.markdown("### ⏱️ توافق الأطر الزمنية")
+    mtf_report = gold_pipeline.report()
+    mtf_color = "#00ff88" if mtf_report['signal'] == "شراء" else "#ff4444" if mtf_report['signal'] == "بيع" else "#FFD700"
+    st.markdown(f"""
+    <div style='background: rgba(30,30,30,0.9); border: 2px solid {mtf_color}; border-radius: 10px; padding: 15px; text-align: center;'>
+        <h3 style='color: {mtf_color}; margin: 0;'>{mtf_report['signal']} ({mtf_report['score']:+.1f})</h3>
+        <p style='color: #888; margin: 5px 0 0 0;'>{mtf_report.get('quality', '')} | {mtf_report['agreement']}/{mtf_report.get('available', 0)} أطر</p>
+    </div>
+    """, unsafe_allow_html=True)
+    mtf_cols = st.columns(len(mtf_report['timeframes']))
+    for col, (tf, row) in zip(mtf_cols, mtf_report['timeframes'].items()):
+        with col:
+            if row:
+                st.metric(tf, row['signal'], f"{row['confidence']}% | RSI {row['rsi']}")
+            else:
+                st.metric(tf, "—", "بيانات غير كافية")
+
+    # === MULTI-ASSET LEADERBOARD (same scoring, all TARGET_PAIRS in one pass) ===
+    st.markdown("---")
+    st.markdown("### 🏆 ترتيب الأصول")
+    board = leaderboard.fetch(client)
+    if not board.empty:
+        st.dataframe(
+            board[['symbol', 'signal', 'confidence', 'net_score', 'trend_score', 'momentum_score', 'rsi', 'atr_pct', 'sentiment']],
+            use_container_width=True, hide_index=True
+        )
+    else:
+        st.warning("⏳ في انتظار بيانات كافية للترتيب...")
+
 with tab4:
     # === AI Analysis Tab ===
     st.markdown("### 🤖 التحليل بالذكاء الاصطناعي")
@@ -705,7 +744,7 @@ with tab5:
         if st.button("🚀 تشغيل الاختبار", use_container_width=True):
             with st.spinner("جاري اختبار الاستراتيجية..."):
                 # Load historical data
-                bt_df = client.fetch_data(selected_symbol, '1h', bt_days * 24)
+                bt_df = backtester.load_historical_data(selected_symbol, days=bt_days)
                 
                 if bt_df is not None and not bt_df.empty:
                     # Run backtest
@@ -26,8 +26,13 @@ def init_db():
             stop_loss REAL,
             take_profit REAL,
             reason TEXT,
-            status TEXT DEFAULT 'PENDING'
+            status TEXT DEFAULT 'PENDING',
+            strategy_id TEXT DEFAULT 'default'
         )''')
+        # Older databases: signals are now tagged with the strategy that produced them
+        columns = [row[1] for row in c.execute("PRAGMA table_info(signals)")]
+        if 'strategy_id' not in columns:
+            c.execute("ALTER TABLE signals ADD COLUMN strategy_id TEXT DEFAULT 'default'")
         conn.row_factory = sqlite3.Row
         
         # Table for Market Status (Snapshot for Dashboard)
@@ -73,14 +78,14 @@ def init_db():
     except Exception as e:
         print(f"ERROR: Failed to initialize database: {e}")
 
-def log_signal(symbol, type, price, sl, tp, reason, status='PENDING'):
+def log_signal(symbol, type, price, sl, tp, reason, status='PENDING', strategy_id='default'):
     """Logs a new trade signal."""
     conn = sqlite3.connect(DB_NAME)
     c = conn.cursor()
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    c.execute('''INSERT INTO signals (timestamp, symbol, type, price, stop_loss, take_profit, reason, status)
-                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', 
-              (timestamp, symbol, type, price, sl, tp, reason, status))
+    c.execute('''INSERT INTO signals (timestamp, symbol, type, price, stop_loss, take_profit, reason, status, strategy_id)
+                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''', 
+              (timestamp, symbol, type, price, sl, tp, reason, status, strategy_id))
     conn.commit()
     conn.close()
 
@@ -146,10 +151,29 @@ def update_market_status(symbol, price, trend, rsi):
     conn.commit()
     conn.close()
 
-def get_recent_signals(limit=10):
-    """Fetches recent signals for the dashboard."""
+def get_recent_signals(limit=10, strategy_id=None, include_paper=False):
+    """
+    Fetches recent signals for the dashboard (optionally of one strategy only).
+    PAPER rows from the multi-strategy runner (any variant, 'default' included) are left out
+    unless include_paper is set, so the list only shows live signals.
+    """
+    conditions, params = [], []
+    if not include_paper:
+        conditions.append("status != 'PAPER'")
+    if strategy_id is not None:
+        conditions.append("strategy_id=?")
+        params.append(strategy_id)
+    where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
     conn = sqlite3.connect(DB_NAME)
-    df = pd.read_sql(f"SELECT * FROM signals ORDER BY id DESC LIMIT {limit}", conn)
+    df = pd.read_sql(f"SELECT * FROM signals {where}ORDER BY id DESC LIMIT {int(limit)}", conn, params=params)
+    conn.close()
+    return df
+
+def get_strategy_summary():
+    """Signal counts per strategy and direction (multi-strategy runner comparison)."""
+    conn = sqlite3.connect(DB_NAME)
+    df = pd.read_sql("""SELECT strategy_id, type, COUNT(*) AS signals, MAX(timestamp) AS last_signal
+                        FROM signals GROUP BY strategy_id, type ORDER BY strategy_id, type""", conn)
     conn.close()
     return df
 
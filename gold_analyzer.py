@@ -9,13 +9,18 @@ Multi-Timeframe + Advanced Scoring + Market Sentiment
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from indicator_cache import cached_ema
+from indicators import ensure_indicators
 
 
 class GoldAnalyzer:
     """Institutional-grade Gold Analyzer with advanced metrics."""
+
+    # Columns read from the frame (computed only if the caller did not add them)
+    REQUIRED_INDICATORS = ['EMA_200', 'MACD', 'MACD_Signal', 'MACD_Hist', 'RSI', 'ATR', 'BBL_20_2.0', 'BBU_20_2.0']
     
-    def __init__(self):
-        self.symbol = 'PAXG/USDT'
+    def __init__(self, symbol='PAXG/USDT'):
+        self.symbol = symbol
         
         # Weight configuration for confidence scoring
         self.weights = {
@@ -107,10 +112,10 @@ class GoldAnalyzer:
         close = curr['close']
         
         # Calculate multiple EMAs
-        ema_9 = df['close'].ewm(span=9, adjust=False).mean().iloc[-1]
-        ema_21 = df['close'].ewm(span=21, adjust=False).mean().iloc[-1]
-        ema_50 = df['close'].ewm(span=50, adjust=False).mean().iloc[-1]
-        ema_100 = df['close'].ewm(span=100, adjust=False).mean().iloc[-1]
+        ema_9 = cached_ema(df, 9).iloc[-1]
+        ema_21 = cached_ema(df, 21).iloc[-1]
+        ema_50 = cached_ema(df, 50).iloc[-1]
+        ema_100 = cached_ema(df, 100).iloc[-1]
         ema_200 = curr['EMA_200']
         
         # Trend scoring (0-100)
@@ -424,9 +429,29 @@ class GoldAnalyzer:
             'atr': round(atr, 2),
             'buy_score': buy_score,
             'sell_score': sell_score,
+            'buy_confidence': buy_confidence,
+            'sell_confidence': sell_confidence,
             'timestamp': datetime.now().strftime('%H:%M:%S')
         }
     
+    def score_history(self, df):
+        """
+        generate_professional_recommendation for every bar in one vectorized pass.
+        Row i equals the recommendation computed on df.iloc[:i+1] (same roundings and
+        integer confidences); rows before index 199 have no signal.
+        Returns a DataFrame aligned with df.
+        """
+        df = ensure_indicators(df, self.REQUIRED_INDICATORS)
+        columns = {name: df[name].to_numpy(dtype=float) for name in ['open', 'high', 'low', 'close'] + self.REQUIRED_INDICATORS}
+        for n in (9, 21, 50, 100):
+            columns[f'EMA_{n}'] = cached_ema(df, n).to_numpy()
+
+        scores = score_bars(columns)
+        out = pd.DataFrame(scores, index=df.index)
+        # Same 200-bar requirement as the latest-bar recommendation
+        out.loc[np.arange(len(df)) < 199, 'signal'] = None
+        return out
+
     def get_market_sentiment(self, df):
         """Calculate overall market sentiment."""
         if len(df) < 50:
@@ -464,6 +489,7 @@ class GoldAnalyzer:
         if df is None or len(df) < 200:
             return None
         
+        df = ensure_indicators(df, self.REQUIRED_INDICATORS)
         recommendation = self.generate_professional_recommendation(df)
         if not recommendation:
             return None
@@ -480,3 +506,97 @@ class GoldAnalyzer:
             'momentum': recommendation['momentum'],
             'timestamp': datetime.now().strftime('%H:%M:%S')
         }
+
+
+def _prev(x):
+    """Value of the previous bar along the last axis (NaN for the first bar)."""
+    out = np.full(x.shape, np.nan)
+    out[..., 1:] = x[..., :-1]
+    return out
+
+
+def score_bars(columns):
+    """
+    The GoldAnalyzer recommendation rules on arrays (time on the last axis), so one
+    call scores a whole history (1-D) or a whole universe (symbols x time).
+    columns: open/high/low/close, EMA_9/21/50/100/200, RSI, MACD, MACD_Signal,
+    MACD_Hist, BBL_20_2.0, BBU_20_2.0 and ATR.
+    Returns {name: array} with trend/momentum scores, buy/sell scores, confidences and signal.
+    """
+    close = columns['close']
+    ema_9, ema_21, ema_50, ema_100, ema_200 = (columns[f'EMA_{n}'] for n in (9, 21, 50, 100, 200))
+
+    # Trend strength (analyze_trend_strength)
+    trend = (
+        10 * (close > ema_9) + 10 * (close > ema_21) + 15 * (close > ema_50)
+        + 15 * (close > ema_100) + 20 * (close > ema_200)
+        + 10 * (ema_9 > ema_21) + 10 * (ema_21 > ema_50) + 10 * (ema_50 > ema_200)
+    )
+
+    # Momentum (analyze_momentum); the recommendation reads the RSI rounded to 1 decimal
+    rsi_raw = columns['RSI']
+    rsi_score = np.select(
+        [rsi_raw > 80, rsi_raw > 70, rsi_raw < 20, rsi_raw < 30, (rsi_raw >= 45) & (rsi_raw <= 55), rsi_raw > 55],
+        [-20, -10, 20, 10, 0, 5], default=-5,
+    )
+    hist = columns['MACD_Hist']
+    macd_bullish = columns['MACD'] > columns['MACD_Signal']
+    macd_increasing = hist > _prev(hist)
+    macd_score = np.select(
+        [macd_bullish & macd_increasing, macd_bullish, ~macd_bullish & ~macd_increasing],
+        [20, 10, -20], default=-10,
+    )
+    momentum = np.clip(50 + rsi_score + macd_score, 0, 100)
+    rsi = np.round(rsi_raw, 1)
+
+    # 1. Trend, 2. Momentum, 3. RSI zones
+    buy = np.select([trend >= 70, trend >= 50], [25, 15], default=0)
+    sell = np.select([trend >= 70, trend >= 50, trend <= 30, trend <= 40], [0, 0, 25, 15], default=0)
+    buy = buy + np.select([momentum >= 65, momentum >= 55], [20, 10], default=0)
+    sell = sell + np.select([momentum >= 65, momentum >= 55, momentum <= 35, momentum <= 45], [0, 0, 20, 10], default=0)
+    buy = buy + np.select([rsi < 25, rsi < 35], [15, 10], default=0)
+    sell = sell + np.select([rsi < 25, rsi < 35, rsi > 75, rsi > 65], [0, 0, 15, 10], default=0)
+
+    # 4. Bollinger position
+    bb_lower = columns['BBL_20_2.0']
+    bb_upper = columns['BBU_20_2.0']
+    bb_mid = (bb_upper + bb_lower) / 2
+    buy = buy + np.select([close <= bb_lower * 1.005, close < bb_mid], [15, 5], default=0)
+    sell = sell + np.select([close >= bb_upper * 0.995, close > bb_mid], [15, 5], default=0)
+
+    # 5. Pivots of the previous bar (rounded to 2 decimals like calculate_pivot_points)
+    prev_high, prev_low = _prev(columns['high']), _prev(columns['low'])
+    pivot = (prev_high + prev_low + _prev(close)) / 3
+    s1 = np.round((2 * pivot) - prev_high, 2)
+    r1 = np.round((2 * pivot) - prev_low, 2)
+    buy = buy + 10 * (close <= s1 * 1.005)
+    sell = sell + 10 * (close >= r1 * 0.995)
+
+    # 6. MACD crossover
+    buy = buy + np.where(macd_bullish, 10, 0)
+    sell = sell + np.where(macd_bullish, 0, 10)
+
+    # Final signal (integer confidences out of 95, threshold 40, 15-point margin)
+    total_possible = 95
+    buy_confidence = np.minimum(99, np.trunc((buy / total_possible) * 100)).astype(int)
+    sell_confidence = np.minimum(99, np.trunc((sell / total_possible) * 100)).astype(int)
+    THRESHOLD = 40
+    is_buy = (buy_confidence >= THRESHOLD) & (buy_confidence > sell_confidence + 15)
+    is_sell = ~is_buy & (sell_confidence >= THRESHOLD) & (sell_confidence > buy_confidence + 15)
+
+    atr = columns['ATR']
+    return {
+        'trend_score': trend,
+        'momentum_score': momentum,
+        'rsi': rsi,
+        'buy_score': buy,
+        'sell_score': sell,
+        'buy_confidence': buy_confidence,
+        'sell_confidence': sell_confidence,
+        'confidence': np.where(is_buy, buy_confidence, np.where(is_sell, sell_confidence, np.maximum(buy_confidence, sell_confidence))),
+        'signal': np.where(is_buy, "شراء", np.where(is_sell, "بيع", "انتظار")).astype(object),
+        'pivot_s1': s1,
+        'pivot_r1': r1,
+        'stop_loss': np.where(is_sell, close + atr * 2, close - atr * 2),
+        'take_profit_1': np.where(is_sell, close - atr * 2, close + atr * 2),
+    }
@@ -0,0 +1,125 @@
+"""
+=======================================================
+🥇 Gold Multi-Timeframe Pipeline - القلعة الذهبية
+Concurrent fetch of every timeframe + one confluence report
+=======================================================
+"""
+
+import threading
+import time
+from datetime import datetime
+import config
+from resampler import timeframe_to_ms
+
+# Higher timeframes weigh more in the confluence score
+TIMEFRAME_WEIGHTS = {'15m': 1, '1h': 2, '4h': 3, '1d': 4}
+
+
+class GoldPipeline:
+    """
+    Runs GoldAnalyzer.get_full_analysis on several timeframes of one symbol.
+    All timeframes are requested at once through BinanceClient.fetch_many, so the
+    report costs one round trip; it is cached until the smallest timeframe's next close.
+    """
+
+    def __init__(self, client, strategy, analyzer, symbol='PAXG/USDT', timeframes=None, limit=None):
+        self.client = client
+        self.strategy = strategy
+        self.analyzer = analyzer
+        self.symbol = symbol
+        self.timeframes = list(timeframes or config.GOLD_TIMEFRAMES)
+        self.limit = limit or config.LIMIT
+        self._cached = None  # {'report', 'expires'}
+        self._lock = threading.Lock()
+
+    def fetch(self):
+        """{timeframe: df} for every timeframe, fetched concurrently."""
+        return {timeframe: df for (_, timeframe, _), df in self.client.fetch_many(
+            (self.symbol, timeframe, self.limit) for timeframe in self.timeframes
+        )}
+
+    def analyze(self, frames):
+        """{timeframe: get_full_analysis result or None}."""
+        analyses = {}
+        for timeframe in self.timeframes:
+            df = frames.get(timeframe)
+            if df is None or df.empty:
+                analyses[timeframe] = None
+                continue
+            analyses[timeframe] = self.analyzer.get_full_analysis(self.strategy.apply_indicators(df))
+        return analyses
+
+    def report(self):
+        """Confluence report (cached until the next candle close of the smallest timeframe)."""
+        now = int(time.time() * 1000)
+        with self._lock:
+            if self._cached is not None and now < self._cached['expires']:
+                return self._cached['report']
+
+        report = confluence(self.analyze(self.fetch()))
+        interval_ms = min(timeframe_to_ms(tf) for tf in self.timeframes)
+        with self._lock:
+            self._cached = {'report': report, 'expires': (now // interval_ms + 1) * interval_ms}
+        return report
+
+
+def confluence(analyses):
+    """
+    Merges per-timeframe analyses into one report.
+    score: weighted mean of (buy_confidence - sell_confidence), from -99 (sell) to +99 (buy).
+    """
+    rows = {}
+    weighted, total_weight = 0, 0
+    for timeframe, analysis in analyses.items():
+        if not analysis:
+            rows[timeframe] = None
+            continue
+        rec = analysis['recommendation']
+        net = rec['buy_confidence'] - rec['sell_confidence']
+        rows[timeframe] = {
+            'signal': rec['signal'],
+            'confidence': rec['confidence'],
+            'net': net,
+            'trend': rec['trend']['direction'],
+            'trend_strength': rec['trend']['strength'],
+            'momentum': rec['momentum'].get('momentum_score', 50),
+            'rsi': rec['momentum'].get('rsi', 50),
+            'sentiment': analysis['sentiment']['score'],
+        }
+        weight = TIMEFRAME_WEIGHTS.get(timeframe, 1)
+        weighted += weight * net
+        total_weight += weight
+
+    available = [row for row in rows.values() if row]
+    if not available:
+        return {'signal': "انتظار", 'score': 0, 'agreement': 0, 'timeframes': rows, 'levels': {},
+                'timestamp': datetime.now().strftime('%H:%M:%S')}
+
+    score = round(weighted / total_weight, 1)
+    if score >= 15:
+        signal = "شراء"
+    elif score <= -15:
+        signal = "بيع"
+    else:
+        signal = "انتظار"
+    agreement = sum(1 for row in available if row['signal'] == signal)
+
+    if agreement == len(available):
+        quality = "توافق كامل 🟢"
+    elif agreement * 2 > len(available):
+        quality = "توافق جزئي 🟡"
+    else:
+        quality = "تعارض بين الأطر ⚠️"
+
+    # Key levels from the highest timeframe that has an analysis
+    top = next(analyses[tf] for tf in sorted(analyses, key=lambda tf: -timeframe_to_ms(tf)) if analyses[tf])
+    return {
+        'signal': signal,
+        'score': score,
+        'agreement': agreement,
+        'available': len(available),
+        'quality': quality,
+        'timeframes': rows,
+        'levels': {'pivots': top['pivots'], 'fibonacci': top['fibonacci']},
+        'timestamp': datetime.now().strftime('%H:%M:%S'),
+    }
@@ -0,0 +1,108 @@
+"""
+=======================================================
+Indicator Cache - Shared Memoization of Indicator Results
+Keyed by symbol, timeframe, candle window and parameters (LRU, memory capped)
+=======================================================
+"""
+
+import threading
+from collections import OrderedDict
+import pandas as pd
+import config
+import indicators
+
+
+def _size(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True))
+    return 64
+
+
+def _copy(value):
+    return value.copy() if hasattr(value, 'copy') else value
+
+
+class IndicatorCache:
+    """
+    LRU cache for indicator frames/series.
+    Only frames tagged by fetch_data (df.attrs 'symbol' and 'timeframe') are cached;
+    the key also covers the window bounds and the last candle's close/volume,
+    so a revised live candle is a different entry.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (value, size)
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(df, name, params):
+        symbol = df.attrs.get('symbol')
+        timeframe = df.attrs.get('timeframe')
+        if symbol is None or timeframe is None or df.empty:
+            return None
+        first, last = df.iloc[0], df.iloc[-1]
+        return (
+            symbol, timeframe, len(df), first['timestamp'], last['timestamp'],
+            float(last['close']), float(last['volume']),
+            name, hash(tuple(sorted(params.items()))),
+        )
+
+    def get_or_compute(self, df, name, compute, **params):
+        """Returns a copy of compute(df) for this frame, computing it only once."""
+        key = self.make_key(df, name, params)
+        if key is None:
+            return compute(df)
+
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return _copy(entry[0])
+            self.misses += 1
+
+        value = compute(df)
+        self._put(key, _copy(value))
+        return value
+
+    def _put(self, key, value):
+        size = _size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+
+# Shared by the bot, dashboard, strategy and analyzers in this process
+indicator_cache = IndicatorCache(config.INDICATOR_CACHE_MB * 1024 * 1024)
+
+
+def tag(df, symbol, timeframe):
+    """Marks a frame as the candles of symbol/timeframe so its indicators can be cached."""
+    if df is not None:
+        df.attrs['symbol'] = symbol
+        df.attrs['timeframe'] = timeframe
+    return df
+
+
+def cached_ema(df, span):
+    """EMA(span, adjust=False) of the close of a tagged frame, shared across consumers."""
+    name = f'EMA_{span}'
+    return indicator_cache.get_or_compute(df, name, lambda d: indicators.compute(d, [name])[name])
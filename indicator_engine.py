@@ -0,0 +1,238 @@
+"""
+=======================================================
+Indicator Engine - Incremental Strategy Indicators
+O(1) updates per candle instead of recomputing 300 rows every cycle
+=======================================================
+"""
+
+import math
+from collections import deque
+import numpy as np
+import pandas as pd
+from resampler import to_epoch_ms
+
+INDICATOR_COLUMNS = ['EMA_200', 'MACD', 'MACD_Signal', 'MACD_Hist', 'BBL_20_2.0', 'BBU_20_2.0', 'RSI', 'ATR', 'Volume_MA']
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+class IndicatorState:
+    """
+    Recursions and ring buffers for one (symbol, timeframe).
+    Mirrors Strategy.apply_indicators: EMAs with adjust=False, Wilder RSI/ATR
+    as ewm(alpha=1/14), rolling(20) Bollinger Bands and Volume MA.
+    """
+
+    def __init__(self, ema_period=200, bb_period=20, volume_period=20, rsi_period=14, atr_period=14):
+        self.ema_alpha = 2 / (ema_period + 1)
+        self.rsi_alpha = 1 / rsi_period
+        self.atr_alpha = 1 / atr_period
+        self.bb_period = bb_period
+        self.volume_period = volume_period
+
+        self.last_ts = None
+        self.prev_close = None
+        self.ema = self.ema12 = self.ema26 = self.signal = None
+        self.avg_gain = self.avg_loss = self.atr = None
+        self.closes = deque(maxlen=bb_period)
+        self.volumes = deque(maxlen=volume_period)
+        self._snapshot = None
+
+    def _save(self):
+        self._snapshot = (
+            self.last_ts, self.prev_close, self.ema, self.ema12, self.ema26, self.signal,
+            self.avg_gain, self.avg_loss, self.atr, deque(self.closes, self.bb_period),
+            deque(self.volumes, self.volume_period),
+        )
+
+    def _restore(self):
+        (self.last_ts, self.prev_close, self.ema, self.ema12, self.ema26, self.signal,
+         self.avg_gain, self.avg_loss, self.atr, self.closes, self.volumes) = self._snapshot
+
+    @staticmethod
+    def _ewm(prev, value, alpha):
+        return value if prev is None else prev + alpha * (value - prev)
+
+    def update(self, ts, o, h, l, c, v):
+        """
+        Applies one candle. A candle with the same timestamp as the last one
+        replaces it (live bar revision): state is rolled back before re-applying.
+        Returns the indicator values for this candle.
+        """
+        if self.last_ts is not None and ts == self.last_ts:
+            self._restore()
+        self._save()
+
+        self.ema = self._ewm(self.ema, c, self.ema_alpha)
+        self.ema12 = self._ewm(self.ema12, c, 2 / 13)
+        self.ema26 = self._ewm(self.ema26, c, 2 / 27)
+        macd = self.ema12 - self.ema26
+        self.signal = self._ewm(self.signal, macd, 2 / 10)
+
+        # pandas: the first diff is NaN and .where() turns it into 0 gain/loss
+        delta = 0.0 if self.prev_close is None else c - self.prev_close
+        self.avg_gain = self._ewm(self.avg_gain, max(delta, 0.0), self.rsi_alpha)
+        self.avg_loss = self._ewm(self.avg_loss, max(-delta, 0.0), self.rsi_alpha)
+        if self.avg_loss == 0:
+            rsi = math.nan if self.avg_gain == 0 else 100.0
+        else:
+            rsi = 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+
+        tr = h - l if self.prev_close is None else max(h - l, abs(h - self.prev_close), abs(l - self.prev_close))
+        self.atr = self._ewm(self.atr, tr, self.atr_alpha)
+
+        self.closes.append(c)
+        self.volumes.append(v)
+        bbl = bbu = volume_ma = math.nan
+        if len(self.closes) == self.bb_period:
+            window = np.fromiter(self.closes, dtype=float, count=self.bb_period)
+            mean, std = window.mean(), window.std(ddof=1)
+            bbl, bbu = mean - 2 * std, mean + 2 * std
+        if len(self.volumes) == self.volume_period:
+            volume_ma = sum(self.volumes) / self.volume_period
+
+        self.prev_close = c
+        self.last_ts = ts
+        return [self.ema, self.ema12, self.ema26, self.signal, self.avg_gain, self.avg_loss, self.atr,
+                bbl, bbu, volume_ma]
+
+
+# Full-stream recursion values stored with every row (see window_values)
+STATE_COLUMNS = ['ema', 'ema12', 'ema26', 'signal', 'avg_gain', 'avg_loss', 'atr', 'bbl', 'bbu', 'volume_ma']
+
+
+def window_values(first, rows, offset, ema_period=200, bb_period=20, volume_period=20,
+                  rsi_period=14, atr_period=14):
+    """
+    Converts full-stream values into what apply_indicators returns for a frame starting at `first`.
+    first: the window's first row; rows: the rows to convert ({column: value or array});
+    offset: their distance from the first row.
+
+    An adjust=False EMA started at the window's first row differs from the full-stream one by
+    r**offset * (x_first - y_first) (r = 1 - alpha), so the correction is O(1) per row. The MACD
+    signal line is an EMA of corrected values, which adds two geometric terms. The rolling
+    windows (Bollinger Bands, Volume MA) are NaN until the window holds enough rows.
+    """
+    j = np.asarray(offset, dtype=float)
+    r_ema, r12, r26, r9 = 1 - 2 / (ema_period + 1), 11 / 13, 25 / 27, 0.8
+    r_rsi, r_atr = 1 - 1 / rsi_period, 1 - 1 / atr_period
+
+    c0 = first['close']
+    d12, d26 = c0 - first['ema12'], c0 - first['ema26']
+    ema12 = rows['ema12'] + r12 ** j * d12
+    ema26 = rows['ema26'] + r26 ** j * d26
+    macd = ema12 - ema26
+
+    def signal_of_geometric(q):
+        # EMA(span=9) of q**offset, started at 1
+        b = 0.2 * q / (q - r9)
+        return b * q ** j + (1 - b) * r9 ** j
+
+    signal = (rows['signal'] + r9 ** j * (first['ema12'] - first['ema26'] - first['signal'])
+              + d12 * signal_of_geometric(r12) - d26 * signal_of_geometric(r26))
+
+    # The first delta of the window is NaN -> 0 gain/loss; the first true range is high - low
+    avg_gain = rows['avg_gain'] - r_rsi ** j * first['avg_gain']
+    avg_loss = rows['avg_loss'] - r_rsi ** j * first['avg_loss']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - 100 / (1 + np.divide(avg_gain, avg_loss))
+
+    return {
+        'EMA_200': rows['ema'] + r_ema ** j * (c0 - first['ema']),
+        'MACD': macd,
+        'MACD_Signal': signal,
+        'MACD_Hist': macd - signal,
+        'BBL_20_2.0': np.where(j >= bb_period - 1, rows['bbl'], np.nan),
+        'BBU_20_2.0': np.where(j >= bb_period - 1, rows['bbu'], np.nan),
+        'RSI': rsi,
+        'ATR': rows['atr'] + r_atr ** j * (first['high'] - first['low'] - first['atr']),
+        'Volume_MA': np.where(j >= volume_period - 1, rows['volume_ma'], np.nan),
+    }
+
+
+class IndicatorEngine:
+    """
+    Keeps an IndicatorState and the last `history` rows per (symbol, timeframe).
+    The state runs over everything fed since the last seed; values are converted with
+    window_values, so they equal Strategy.apply_indicators on the same rows.
+    """
+
+    def __init__(self, strategy=None, history=300):
+        self.ema_period = strategy.ema_trend_period if strategy else 200
+        self.volume_period = strategy.volume_ma_period if strategy else 20
+        self.history = history
+        self.states = {}
+        self.rows = {}
+
+    def _new_state(self):
+        return IndicatorState(ema_period=self.ema_period, volume_period=self.volume_period)
+
+    def _window(self, first, rows, offset):
+        return window_values(first, rows, offset, ema_period=self.ema_period, volume_period=self.volume_period)
+
+    def update(self, symbol, timeframe, row):
+        """
+        Feeds one candle [ts_ms, o, h, l, c, v]. Older candles than the last one are ignored.
+        Returns the indicator values of this candle over the rows currently held.
+        """
+        key = (symbol, timeframe)
+        state = self.states.get(key)
+        if state is None:
+            state = self.states[key] = self._new_state()
+            self.rows[key] = deque(maxlen=self.history)
+
+        ts = int(row[0])
+        if state.last_ts is not None and ts < state.last_ts:
+            return None
+
+        rows = self.rows[key]
+        if rows and rows[-1][0] == ts:
+            rows.pop()
+        rows.append([ts, *map(float, row[1:6]), *state.update(ts, *map(float, row[1:6]))])
+
+        columns = OHLCV_COLUMNS + STATE_COLUMNS
+        values = self._window(dict(zip(columns, rows[0])), dict(zip(columns, rows[-1])), len(rows) - 1)
+        return {name: float(value) for name, value in values.items()}
+
+    def seed(self, symbol, timeframe, df):
+        """Resets the state for this key and replays a whole frame."""
+        self.states.pop((symbol, timeframe), None)
+        self.rows.pop((symbol, timeframe), None)
+        self.sync(symbol, timeframe, df)
+
+    def sync(self, symbol, timeframe, df):
+        """
+        Feeds the rows of a freshly fetched frame that are new (or revise the last bar).
+        Reseeds if the frame does not connect to what was fed before.
+        Returns the enriched frame (same columns as Strategy.apply_indicators).
+        """
+        key = (symbol, timeframe)
+        ts = to_epoch_ms(df['timestamp'])
+        values = df[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=float)
+
+        state = self.states.get(key)
+        if state is not None and (state.last_ts is None or ts[0] > state.last_ts or ts[-1] < state.last_ts):
+            self.states.pop(key)
+            self.rows.pop(key)
+            state = None
+
+        start = 0 if state is None else int(np.searchsorted(ts, state.last_ts))
+        for i in range(start, len(ts)):
+            self.update(symbol, timeframe, [ts[i], *values[i]])
+        return self.frame(symbol, timeframe, limit=len(df))
+
+    def frame(self, symbol, timeframe, limit=None):
+        """The last `limit` rows with indicators computed as apply_indicators would on exactly those rows."""
+        rows = list(self.rows.get((symbol, timeframe), []))
+        if limit is not None:
+            rows = rows[-limit:]
+        # Built from one array in a single DataFrame call (per-column inserts dominate otherwise)
+        raw = np.array(rows, dtype=float).reshape(len(rows), len(OHLCV_COLUMNS) + len(STATE_COLUMNS))
+        columns = dict(zip(OHLCV_COLUMNS + STATE_COLUMNS, raw.T))
+        data = {name: columns[name] for name in OHLCV_COLUMNS}
+        data['timestamp'] = pd.to_datetime(columns['timestamp'].astype(np.int64), unit='ms')
+        if len(raw):
+            first = {name: values[0] for name, values in columns.items()}
+            data.update(self._window(first, columns, np.arange(len(raw))))
+        else:
+            data.update({name: np.empty(0) for name in INDICATOR_COLUMNS})
+        return pd.DataFrame(data)
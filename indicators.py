@@ -0,0 +1,190 @@
+"""
+=======================================================
+Indicator Registry - Declarative Indicator Definitions
+Consumers list the columns they need; dependencies are resolved
+and every shared intermediate is computed once
+=======================================================
+"""
+
+import re
+import pandas as pd
+from candles import as_frame
+
+_REGISTRY = []  # (compiled pattern, deps templates, fn)
+
+# Short names used across the project
+ALIASES = {'RSI': 'RSI_14', 'ATR': 'ATR_14', 'Volume_MA': 'VOLUME_MA_20'}
+
+
+def indicator(pattern, deps=()):
+    """
+    Registers fn(df, *dep_values, *pattern_groups) under a name pattern.
+    Dependency names may use the pattern groups: deps=('SMA_{0}', 'STD_{0}').
+    """
+    def register(fn):
+        _REGISTRY.append((re.compile(pattern), deps, fn))
+        return fn
+    return register
+
+
+def _lookup(name):
+    name = ALIASES.get(name, name)
+    for pattern, deps, fn in _REGISTRY:
+        match = pattern.fullmatch(name)
+        if match:
+            groups = match.groups()
+            return name, [d.format(*groups) for d in deps], fn, groups
+    raise KeyError(f"Unknown indicator: {name}")
+
+
+def plan(names):
+    """Dependency-ordered list of the indicators needed for `names` (each once)."""
+    order, seen = [], set()
+
+    def visit(name):
+        name, deps, _, _ = _lookup(name)
+        if name in seen:
+            return
+        for dep in deps:
+            visit(dep)
+        seen.add(name)
+        order.append(name)
+
+    for name in names:
+        visit(name)
+    return order
+
+
+def compute(df, names):
+    """Returns {name: Series} for the requested indicators (intermediates are not returned)."""
+    df = as_frame(df)
+    values = {}
+    for name in plan(names):
+        _, deps, fn, groups = _lookup(name)
+        values[name] = fn(df, *[values[d] for d in deps], *groups)
+    return {name: values[ALIASES.get(name, name)] for name in names}
+
+
+def add_indicators(df, names):
+    """Adds the requested indicator columns to df (in place) and returns it."""
+    for name, series in compute(df, names).items():
+        df[name] = series
+    return df
+
+
+def ensure_indicators(df, names):
+    """Adds only the requested columns that df does not have yet."""
+    missing = [name for name in names if name not in df.columns]
+    return add_indicators(df, missing) if missing else df
+
+
+# ==========================================================
+# Trend
+# ==========================================================
+
+@indicator(r'EMA_(\d+)')
+def _ema(df, n):
+    return df['close'].ewm(span=int(n), adjust=False).mean()
+
+
+@indicator(r'SMA_(\d+)')
+def _sma(df, n):
+    return df['close'].rolling(window=int(n)).mean()
+
+
+@indicator(r'STD_(\d+)')
+def _std(df, n):
+    return df['close'].rolling(window=int(n)).std()
+
+
+# ==========================================================
+# Momentum: MACD (12, 26, 9) and RSI
+# ==========================================================
+
+@indicator('MACD', deps=('EMA_12', 'EMA_26'))
+def _macd(df, fast, slow):
+    return fast - slow
+
+
+@indicator('MACD_Signal', deps=('MACD',))
+def _macd_signal(df, macd):
+    return macd.ewm(span=9, adjust=False).mean()
+
+
+@indicator('MACD_Hist', deps=('MACD', 'MACD_Signal'))
+def _macd_hist(df, macd, signal):
+    return macd - signal
+
+
+@indicator('DELTA')
+def _delta(df):
+    return df['close'].diff()
+
+
+@indicator('GAIN', deps=('DELTA',))
+def _gain(df, delta):
+    return delta.where(delta > 0, 0)
+
+
+@indicator('LOSS', deps=('DELTA',))
+def _loss(df, delta):
+    return -delta.where(delta < 0, 0)
+
+
+@indicator(r'RSI_(\d+)', deps=('GAIN', 'LOSS'))
+def _rsi(df, gain, loss, n):
+    """Wilder's smoothing (Strategy)."""
+    alpha = 1 / int(n)
+    rs = gain.ewm(alpha=alpha, adjust=False).mean() / loss.ewm(alpha=alpha, adjust=False).mean()
+    return 100 - (100 / (1 + rs))
+
+
+@indicator(r'RSI_SMA_(\d+)', deps=('GAIN', 'LOSS'))
+def _rsi_sma(df, gain, loss, n):
+    """Simple rolling means (MarketScanner)."""
+    rs = gain.rolling(window=int(n)).mean() / loss.rolling(window=int(n)).mean()
+    return 100 - (100 / (1 + rs))
+
+
+# ==========================================================
+# Volatility: Bollinger Bands and ATR
+# ==========================================================
+
+@indicator(r'BBL_(\d+)_([\d.]+)', deps=('SMA_{0}', 'STD_{0}'))
+def _bb_lower(df, sma, std, n, k):
+    return sma - (float(k) * std)
+
+
+@indicator(r'BBU_(\d+)_([\d.]+)', deps=('SMA_{0}', 'STD_{0}'))
+def _bb_upper(df, sma, std, n, k):
+    return sma + (float(k) * std)
+
+
+@indicator('TR')
+def _true_range(df):
+    prev_close = df['close'].shift(1)
+    tr1 = df['high'] - df['low']
+    tr2 = (df['high'] - prev_close).abs()
+    tr3 = (df['low'] - prev_close).abs()
+    return pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+
+
+@indicator(r'ATR_(\d+)', deps=('TR',))
+def _atr(df, tr, n):
+    """Wilder's smoothing (Strategy)."""
+    return tr.ewm(alpha=1 / int(n), adjust=False).mean()
+
+
+@indicator(r'ATR_SMA_(\d+)', deps=('TR',))
+def _atr_sma(df, tr, n):
+    """Simple rolling mean (MarketScanner)."""
+    return tr.rolling(window=int(n)).mean()
+
+
+# ==========================================================
+# Volume
+# ==========================================================
+
+@indicator(r'VOLUME_MA_(\d+)')
+def _volume_ma(df, n):
+    return df['volume'].rolling(window=int(n)).mean()
@@ -0,0 +1,135 @@
+"""
+=======================================================
+🏆 Leaderboard - Universe-wide Gold Analyzer Scoring
+Ranks every symbol with the GoldAnalyzer rules in one panel pass,
+cached until the next candle close
+=======================================================
+"""
+
+import threading
+import time
+import numpy as np
+import pandas as pd
+import config
+import panel_indicators
+from gold_analyzer import score_bars
+from resampler import timeframe_to_ms
+
+MIN_BARS = 200  # analyze_trend_strength needs 200 candles
+
+
+def _last_window(x, n):
+    """Last n bars of each row (the whole row when shorter)."""
+    return x[:, -n:]
+
+
+def score_panel(symbols, panel):
+    """
+    Latest-bar GoldAnalyzer scores for every row of a stacked panel.
+    Returns one row per symbol with at least MIN_BARS candles.
+    """
+    close, high, low, open_ = panel['close'], panel['high'], panel['low'], panel['open']
+    columns = dict(panel)
+    columns.update(panel_indicators.strategy_indicators(panel))
+    for n in (9, 21, 50, 100):
+        columns[f'EMA_{n}'] = panel_indicators.ema(close, span=n)
+    last = {name: values[:, -1] for name, values in score_bars(columns).items()}
+
+    price = close[:, -1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Volatility (calculate_volatility)
+        atr_pct = columns['ATR'][:, -1] / price * 100
+        bb_width = (columns['BBU_20_2.0'][:, -1] - columns['BBL_20_2.0'][:, -1]) / price * 100
+        returns = _last_window(close[:, 1:] / close[:, :-1] - 1, 20)
+        hist_vol = np.std(returns, axis=1, ddof=1) * 100 * np.sqrt(252)
+
+        # Fibonacci: position of the price inside the 50-candle range (0 = low, 100 = high)
+        fib_high = np.max(_last_window(high, 50), axis=1)
+        fib_low = np.min(_last_window(low, 50), axis=1)
+        fib_position = (price - fib_low) / (fib_high - fib_low) * 100
+
+        # Sentiment (get_market_sentiment)
+        recent_close, recent_open = _last_window(close, 20), _last_window(open_, 20)
+        candles_balance = np.sum(recent_close > recent_open, axis=1) - np.sum(recent_close < recent_open, axis=1)
+        change_5 = (price - close[:, -5]) / close[:, -5] * 100
+        change_20 = (price - close[:, -20]) / close[:, -20] * 100
+        sentiment = np.clip(50 + candles_balance * 2 + change_5 * 3 + change_20, 0, 100)
+
+    board = pd.DataFrame({
+        'symbol': symbols,
+        'price': price,
+        'signal': last['signal'],
+        'confidence': last['confidence'],
+        'buy_score': last['buy_score'],
+        'sell_score': last['sell_score'],
+        'trend_score': last['trend_score'],
+        'momentum_score': last['momentum_score'],
+        'rsi': last['rsi'],
+        'atr_pct': np.round(atr_pct, 2),
+        'bb_width': np.round(bb_width, 2),
+        'hist_vol': np.round(hist_vol, 1),
+        'fib_position': np.round(fib_position, 1),
+        'sentiment': np.trunc(sentiment),
+        'pivot_s1': last['pivot_s1'],
+        'pivot_r1': last['pivot_r1'],
+    })
+    enough = np.sum(~np.isnan(close), axis=1) >= MIN_BARS
+    return board[enough]
+
+
+def rank(frames):
+    """
+    {symbol: OHLCV DataFrame or Candles} -> leaderboard sorted from the strongest
+    buy setup to the strongest sell setup (net score = buy_score - sell_score).
+    """
+    symbols, panel = panel_indicators.stack(frames)
+    if not symbols:
+        return pd.DataFrame()
+    board = score_panel(symbols, panel)
+    board['net_score'] = board['buy_score'] - board['sell_score']
+    board = board.sort_values(['net_score', 'confidence'], ascending=[False, False])
+    return board.reset_index(drop=True)
+
+
+class Leaderboard:
+    """
+    Ranked universe for one timeframe. A board stays valid until the next
+    candle close, so reruns in between neither refetch nor rescore.
+    """
+
+    def __init__(self, timeframe=None, limit=None):
+        self.timeframe = timeframe or config.TIMEFRAME
+        self.limit = limit or config.LEADERBOARD_LIMIT
+        self._cache = {}  # tuple(symbols) -> {'board', 'expires'}
+        self._lock = threading.Lock()
+
+    def _next_close(self):
+        interval_ms = timeframe_to_ms(self.timeframe)
+        now = int(time.time() * 1000)
+        return (now // interval_ms + 1) * interval_ms
+
+    def get(self, symbols):
+        """Cached board for these symbols, or None when missing/expired."""
+        with self._lock:
+            entry = self._cache.get(tuple(symbols))
+        if entry is not None and time.time() * 1000 < entry['expires']:
+            return entry['board'].copy()
+        return None
+
+    def rank(self, symbols, frames):
+        """Scores already fetched frames and caches the board until the next candle close."""
+        board = rank(frames)
+        with self._lock:
+            self._cache[tuple(symbols)] = {'board': board, 'expires': self._next_close()}
+        return board.copy()
+
+    def fetch(self, client, symbols=None):
+        """Board for symbols (default TARGET_PAIRS) using BinanceClient.fetch_many."""
+        symbols = list(symbols or config.TARGET_PAIRS)
+        board = self.get(symbols)
+        if board is not None:
+            return board
+        frames = {symbol: df for (symbol, _, _), df in client.fetch_many(
+            (symbol, self.timeframe, self.limit) for symbol in symbols
+        )}
+        return self.rank(symbols, frames)
@@ -0,0 +1,75 @@
+"""
+=======================================================
+Market Cache - On-disk Exchange Metadata
+Keeps load_markets() results and the server time offset between restarts
+=======================================================
+"""
+
+import os
+import json
+import time
+import config
+
+
+def _cache_path(exchange):
+    # Testnet markets differ from the live ones
+    suffix = '_sandbox' if getattr(exchange, 'isSandboxModeEnabled', False) else ''
+    return os.path.join(config.MARKET_CACHE_DIR, f"{exchange.id}{suffix}.json")
+
+
+def load_cached_markets(exchange):
+    """
+    Restores markets/currencies/time offset from disk if the cache is younger than the TTL.
+    Returns True on success (the exchange will not download markets again).
+    """
+    path = _cache_path(exchange)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    if time.time() - cached.get('saved_at', 0) > config.MARKET_CACHE_TTL:
+        return False
+
+    exchange.set_markets(cached['markets'], cached.get('currencies'))
+    if cached.get('timeDifference') is not None:
+        exchange.options['timeDifference'] = cached['timeDifference']
+    return True
+
+
+def save_markets(exchange):
+    """Writes the exchange's loaded markets to disk."""
+    if not exchange.markets:
+        return
+    os.makedirs(config.MARKET_CACHE_DIR, exist_ok=True)
+    path = _cache_path(exchange)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'saved_at': time.time(),
+            'markets': exchange.markets,
+            'currencies': exchange.currencies,
+            'timeDifference': exchange.options.get('timeDifference'),
+        }, f)
+    os.replace(tmp_path, path)
+
+
+def ensure_markets(exchange):
+    """Sync ccxt: markets from disk, or download them once and cache them."""
+    if config.MARKET_CACHE_ENABLED and load_cached_markets(exchange):
+        return exchange.markets
+    markets = exchange.load_markets()
+    if config.MARKET_CACHE_ENABLED:
+        save_markets(exchange)
+    return markets
+
+
+async def ensure_markets_async(exchange):
+    """ccxt.async_support version of ensure_markets."""
+    if config.MARKET_CACHE_ENABLED and load_cached_markets(exchange):
+        return exchange.markets
+    markets = await exchange.load_markets()
+    if config.MARKET_CACHE_ENABLED:
+        save_markets(exchange)
+    return markets
@@ -1,8 +1,131 @@
 import ccxt
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
 import config
 from datetime import datetime
 import yfinance as yf
+from candle_store import CandleStore
+from resampler import resample
+from rate_limiter import install_rate_limiter
+from market_cache import ensure_markets
+from indicator_cache import tag
+
+# Symbols served by Yahoo Finance instead of Binance
+YAHOO_SYMBOLS = ['GC=F', 'XAU-USD', 'GOLD']
+# Request weight of one klines call (Binance spot)
+KLINES_WEIGHT = 2
+
+# ==========================================================
+# Yahoo Finance cache (Gold)
+# A downloaded series stays valid until its next candle closes;
+# after that only a short tail is downloaded and merged in.
+# ==========================================================
+YAHOO_INTERVAL_MS = {'1m': 60_000, '5m': 300_000, '15m': 900_000, '1h': 3_600_000, '1d': 86_400_000}
+YAHOO_PERIOD_DAYS = {'1d': 1, '5d': 5, '1mo': 31, '3mo': 93}
+_yahoo_cache = {}  # (symbol, interval) -> {'df', 'period', 'expires'}
+_yahoo_lock = threading.Lock()
+
+
+def _yahoo_history(symbol, interval, period):
+    """Downloads one Yahoo series and normalizes it to the CCXT column layout."""
+    df = yf.Ticker(symbol).history(period=period, interval=interval)
+    if df.empty:
+        return None
+
+    # Normalize to match CCXT format
+    df = df.reset_index()
+    # Yahoo columns: Date/Datetime, Open, High, Low, Close, Volume, Dividends, Stock Splits
+    # We need: timestamp, open, high, low, close, volume
+    df.rename(columns={
+        'Date': 'timestamp', 'Datetime': 'timestamp',
+        'Open': 'open', 'High': 'high', 'Low': 'low',
+        'Close': 'close', 'Volume': 'volume'
+    }, inplace=True)
+    return df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
+
+
+def _tail_period(interval, gap_ms):
+    """Smallest Yahoo period that still covers the candles missed since the last download."""
+    # A 1d window may hold no daily candle at all
+    candidates = ('5d',) if interval == '1d' else ('1d', '5d')
+    for period in candidates:
+        if gap_ms + YAHOO_INTERVAL_MS[interval] < YAHOO_PERIOD_DAYS[period] * 86_400_000:
+            return period
+    return None
+
+
+def get_yahoo_data(symbol, interval, period):
+    """
+    Cached Yahoo download. Returns a copy of the cached frame
+    (or None if Yahoo has no data).
+    """
+    key = (symbol, interval)
+    interval_ms = YAHOO_INTERVAL_MS.get(interval, YAHOO_INTERVAL_MS['1h'])
+    now = int(time.time() * 1000)
+
+    with _yahoo_lock:
+        entry = _yahoo_cache.get(key)
+    covers = entry is not None and YAHOO_PERIOD_DAYS.get(entry['period'], 0) >= YAHOO_PERIOD_DAYS.get(period, 0)
+
+    if covers and now < entry['expires']:
+        return entry['df'].copy()
+
+    df = None
+    if covers:
+        last_ts = int(entry['df']['timestamp'].iloc[-1].timestamp() * 1000)
+        tail_period = _tail_period(interval, now - last_ts)
+        if tail_period:
+            tail = _yahoo_history(symbol, interval, tail_period)
+            if tail is not None:
+                # The last cached candle may have been open: tail rows win
+                df = pd.concat([entry['df'], tail])
+                df = df.drop_duplicates(subset='timestamp', keep='last').sort_values('timestamp')
+                cutoff = df['timestamp'].iloc[-1] - pd.Timedelta(days=YAHOO_PERIOD_DAYS[entry['period']])
+                df = df[df['timestamp'] >= cutoff].reset_index(drop=True)
+            else:
+                df = entry['df']
+        period = entry['period']
+
+    if df is None:
+        df = _yahoo_history(symbol, interval, period)
+        if df is None:
+            return None
+
+    with _yahoo_lock:
+        _yahoo_cache[key] = {
+            'df': df,
+            'period': period,
+            'expires': (now // interval_ms + 1) * interval_ms,  # next expected candle close
+        }
+    return df.copy()
+
+
+class RequestPacer:
+    """
+    Thread-safe spacing of request start times.
+    ccxt's built-in throttle is not safe to share between threads,
+    so concurrent fetchers reserve a slot here first.
+    With the shared rate limiter installed every request is already
+    metered there, so the pacer steps aside (limiter set).
+    """
+    def __init__(self, interval_ms, limiter=None):
+        self.interval = interval_ms / 1000
+        self.limiter = limiter
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self, weight=1):
+        if self.limiter is not None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval * weight
+        if slot > now:
+            time.sleep(slot - now)
+
 
 class BinanceClient:
     def __init__(self):
@@ -37,13 +160,29 @@ class BinanceClient:
                 except Exception as e:
                     print(f"⚠️ Could not enable Sandbox: {e}")
 
+        # Cross-process request scheduler (shared with bot.py, dashboard and mcp_server)
+        self.limiter = install_rate_limiter(self.exchange)
+
+        # Markets from the on-disk cache (a full download only when it has expired)
+        try:
+            ensure_markets(self.exchange)
+        except Exception as e:
+            print(f"⚠️ Could not load markets: {e}")
+
+        # Shared request pacing for concurrent fetches (backfills, multi-symbol fetches)
+        self.pacer = RequestPacer(self.exchange.rateLimit, self.limiter)
+        self._pool = None
+
+        # Persistent candle cache (shared with the dashboard and backtester)
+        self.store = CandleStore(config.CANDLE_STORE_DIR) if config.CANDLE_STORE_ENABLED else None
+
     def fetch_data(self, symbol, timeframe, limit):
         """
         Fetches historical OHLCV data. 
         Supports Binance (Crypto) and Yahoo Finance (Gold).
         """
         # --- Yahoo Finance Logic (Gold) ---
-        if symbol in ['GC=F', 'XAU-USD', 'GOLD']:
+        if symbol in YAHOO_SYMBOLS:
             try:
                 # Map timeframe to yfinance format
                 # yfinance supports: 1m, 2m, 5m, 15m, 30m, 60m, 90m, 1h, 1d, 5d, 1wk, 1mo, 3mo
@@ -55,31 +194,18 @@ class BinanceClient:
                 # For 1m data, max is 7 days.
                 period = '1mo'
                 if timeframe == '1m': period = '5d'
+                # Yahoo has no 4h interval: fetch 1h and aggregate (needs more history)
+                if timeframe == '4h': period = '3mo'
 
-                ticker = yf.Ticker(symbol)
-                df = ticker.history(period=period, interval=yf_interval)
-                
-                if df.empty:
+                df = get_yahoo_data(symbol, yf_interval, period)
+                if df is None:
                     print(f"⚠️ Yahoo Finance returned no data for {symbol}")
                     return None
 
-                # Normalize to match CCXT format
-                df = df.reset_index()
-                # Yahoo columns: Date/Datetime, Open, High, Low, Close, Volume, Dividends, Stock Splits
-                # We need: timestamp, open, high, low, close, volume
-                
-                # Handling Timezone to matching UTC timestamp style (optional but good for consistency)
-                # But mostly just need the column names
-                df.rename(columns={
-                    'Date': 'timestamp', 'Datetime': 'timestamp',
-                    'Open': 'open', 'High': 'high', 'Low': 'low', 
-                    'Close': 'close', 'Volume': 'volume'
-                }, inplace=True)
-                
-                # Ensure columns exist and are lower case
-                df = df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
+                if yf_interval != timeframe and timeframe in interval_map:
+                    df = resample(df, timeframe)
                 
-                return df.tail(limit)
+                return tag(df.tail(limit).reset_index(drop=True), symbol, timeframe)
 
             except Exception as e:
                 print(f"Error fetching Yahoo data for {symbol}: {e}")
@@ -87,6 +213,9 @@ class BinanceClient:
 
         # --- Binance Logic (Crypto) ---
         try:
+            if self.store is not None:
+                return tag(self._fetch_via_store(symbol, timeframe, limit), symbol, timeframe)
+
             # print(f"Fetching data for {symbol} ({timeframe})...") 
             ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
             
@@ -99,12 +228,73 @@ class BinanceClient:
             # Convert timestamp to readable date
             df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
             
-            return df
+            return tag(df, symbol, timeframe)
         
         except Exception as e:
             # print(f"Error fetching data for {symbol}: {e}")
             return None
 
+    def _fetch_via_store(self, symbol, timeframe, limit):
+        """
+        Serves candles from the local store and only asks the exchange
+        for candles from the last stored one onwards (it may still have been open).
+        Falls back to a full fetch on cold start, gaps, or stale data.
+        """
+        tf_ms = self.exchange.parse_timeframe(timeframe) * 1000
+        now = self.exchange.milliseconds()
+
+        records = self.store.read_records(symbol, timeframe, limit=limit)
+        ts = records['timestamp']
+        is_fresh = (
+            len(records) == limit
+            and ts[-1] - ts[0] == (limit - 1) * tf_ms   # no holes in the window
+            and now - ts[-1] < limit * tf_ms            # tail fetch is cheaper than a full one
+        )
+
+        if not is_fresh:
+            ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+            if not ohlcv:
+                return None
+            self.store.merge(symbol, timeframe, ohlcv)
+        else:
+            since = int(ts[-1])
+            while True:
+                missing = int((now - since) // tf_ms) + 1
+                page_limit = min(missing + 1, 1000)
+                ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=page_limit)
+                if not ohlcv:
+                    break
+                self.store.merge(symbol, timeframe, ohlcv)
+                # Keep paging only if the exchange capped the response
+                if len(ohlcv) < page_limit or ohlcv[-1][0] <= since:
+                    break
+                since = ohlcv[-1][0]
+
+        return self.store.read(symbol, timeframe, limit=limit)
+
+    def fetch_many(self, requests, max_workers=None):
+        """
+        Fetches several (symbol, timeframe, limit) requests concurrently.
+        Yields ((symbol, timeframe, limit), df) as each one finishes.
+        Request starts are spaced by the exchange rate limit.
+        """
+        requests = list(requests)
+        if not requests:
+            return
+
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=max_workers or config.FETCH_WORKERS)
+
+        def task(request):
+            symbol, timeframe, limit = request
+            if symbol not in YAHOO_SYMBOLS:
+                self.pacer.wait(KLINES_WEIGHT)
+            return self.fetch_data(symbol, timeframe, limit)
+
+        futures = {self._pool.submit(task, request): request for request in requests}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
     def get_current_price(self, symbol):
         try:
             ticker = self.exchange.fetch_ticker(symbol)
@@ -1,8 +1,11 @@
 import os
 import asyncio
+from contextlib import asynccontextmanager
 import ccxt.async_support as ccxt
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
+from rate_limiter import install_rate_limiter
+from market_cache import ensure_markets_async
 
 # Load environment variables
 load_dotenv()
@@ -12,24 +15,71 @@ EXCHANGE_NAME = os.getenv('EXCHANGE_NAME', 'binance')
 API_KEY = os.getenv('API_KEY')
 SECRET_KEY = os.getenv('SECRET_KEY')
 
-# Initialize FastMCP Server
-mcp = FastMCP("CryptoTradingBot")
+# Shared exchange (created on first use, markets loaded once)
+_exchange = None
+_exchange_lock = asyncio.Lock()
 
 async def get_exchange():
-    """Initialize exchange connection."""
-    exchange_class = getattr(ccxt, EXCHANGE_NAME)
-    return exchange_class({
-        'apiKey': API_KEY,
-        'secret': SECRET_KEY,
-        'enableRateLimit': True,
-    })
+    """Returns the shared exchange connection, creating it on first use."""
+    global _exchange
+    async with _exchange_lock:
+        if _exchange is None:
+            exchange_class = getattr(ccxt, EXCHANGE_NAME)
+            exchange = exchange_class({
+                'apiKey': API_KEY,
+                'secret': SECRET_KEY,
+                'enableRateLimit': True,
+            })
+            install_rate_limiter(exchange)
+            try:
+                await ensure_markets_async(exchange)
+            except Exception:
+                await exchange.close()
+                raise
+            _exchange = exchange
+        return _exchange
+
+async def close_exchange(stale=None):
+    """
+    Closes the shared exchange; the next get_exchange() reconnects.
+    With `stale` set, only closes it if it is still that instance (another tool may have reconnected already).
+    """
+    global _exchange
+    async with _exchange_lock:
+        if _exchange is not None and (stale is None or _exchange is stale):
+            exchange, _exchange = _exchange, None
+            await exchange.close()
+
+async def call_exchange(method, *args, retry=True):
+    """
+    Calls a method on the shared exchange.
+    On a network error the connection is rebuilt and, if retry is set, the call is repeated once.
+    """
+    exchange = await get_exchange()
+    try:
+        return await getattr(exchange, method)(*args)
+    except ccxt.NetworkError:
+        await close_exchange(stale=exchange)
+        if not retry:
+            raise
+        exchange = await get_exchange()
+        return await getattr(exchange, method)(*args)
+
+@asynccontextmanager
+async def lifespan(server):
+    try:
+        yield
+    finally:
+        await close_exchange()
+
+# Initialize FastMCP Server
+mcp = FastMCP("CryptoTradingBot", lifespan=lifespan)
 
 @mcp.tool()
 async def get_account_balance() -> str:
     """Get the current account balance for all non-zero assets."""
-    exchange = await get_exchange()
     try:
-        balance = await exchange.fetch_balance()
+        balance = await call_exchange('fetch_balance')
         total_balance = balance['total']
         
         # Filter for non-zero balances
@@ -45,25 +95,20 @@ async def get_account_balance() -> str:
         return report
     except Exception as e:
         return f"Error fetching balance: {str(e)}"
-    finally:
-        await exchange.close()
 
 @mcp.tool()
 async def get_crypto_price(symbol: str) -> str:
     """Get the current price of a cryptocurrency (e.g., BTC/USDT)."""
-    exchange = await get_exchange()
     try:
         symbol = symbol.upper()
         if '/' not in symbol: 
             symbol += '/USDT' # Default to USDT pair if not specified
             
-        ticker = await exchange.fetch_ticker(symbol)
+        ticker = await call_exchange('fetch_ticker', symbol)
         price = ticker['last']
         return f"💵 **{symbol}**: {price}"
     except Exception as e:
         return f"Error fetching price for {symbol}: {str(e)}"
-    finally:
-        await exchange.close()
 
 @mcp.tool()
 async def get_market_sentiment() -> str:
@@ -79,10 +124,6 @@ async def get_market_sentiment() -> str:
     except Exception as e:
         return f"Error fetching sentiment: {str(e)}"
 
-if __name__ == "__main__":
-    # Run the MCP server
-    mcp.run()
-
 @mcp.tool()
 async def execute_trade(symbol: str, side: str, amount: float, type: str = 'market', price: float = None) -> str:
     """
@@ -95,7 +136,6 @@ async def execute_trade(symbol: str, side: str, amount: float, type: str = 'mark
         type: "market" or "limit"
         price: Price for limit orders (required if type is limit)
     """
-    exchange = await get_exchange()
     try:
         symbol = symbol.upper()
         if '/' not in symbol: symbol += '/USDT'
@@ -107,24 +147,22 @@ async def execute_trade(symbol: str, side: str, amount: float, type: str = 'mark
         if type.lower() == 'limit' and not price:
             return "Error: Price is required for limit orders"
             
-        order = await exchange.create_order(symbol, type, side, amount, price)
+        # Never resend an order blindly: it may have reached the exchange
+        order = await call_exchange('create_order', symbol, type, side, amount, price, retry=False)
         return f"✅ **Order Executed**:\nID: {order['id']}\nStatus: {order['status']}\nDetails: {side} {amount} {symbol}"
     except Exception as e:
         return f"❌ Trade Failed: {str(e)}"
-    finally:
-        await exchange.close()
 
 @mcp.tool()
 async def list_open_orders(symbol: str = None) -> str:
     """List all active/open orders."""
-    exchange = await get_exchange()
     try:
         if symbol:
             symbol = symbol.upper()
             if '/' not in symbol: symbol += '/USDT'
-            orders = await exchange.fetch_open_orders(symbol)
+            orders = await call_exchange('fetch_open_orders', symbol)
         else:
-            orders = await exchange.fetch_open_orders()
+            orders = await call_exchange('fetch_open_orders')
             
         if not orders:
             return "No open orders found."
@@ -135,20 +173,19 @@ async def list_open_orders(symbol: str = None) -> str:
         return report
     except Exception as e:
         return f"Error fetching orders: {str(e)}"
-    finally:
-        await exchange.close()
 
 @mcp.tool()
 async def cancel_order(order_id: str, symbol: str) -> str:
     """Cancel a specific order by ID."""
-    exchange = await get_exchange()
     try:
         symbol = symbol.upper()
         if '/' not in symbol: symbol += '/USDT'
         
-        await exchange.cancel_order(order_id, symbol)
+        await call_exchange('cancel_order', order_id, symbol)
         return f"✅ Order {order_id} cancelled successfully."
     except Exception as e:
         return f"❌ Failed to cancel order: {str(e)}"
-    finally:
-        await exchange.close()
+
+if __name__ == "__main__":
+    # Run the MCP server
+    mcp.run()
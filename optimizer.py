@@ -0,0 +1,250 @@
+"""
+=======================================================
+Optimizer - Parallel Strategy Parameter Sweeps
+Grid / random search over Strategy parameters on a process pool;
+workers read the OHLCV arrays from shared memory
+=======================================================
+"""
+
+import os
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+import config
+from candles import as_frame
+from resampler import to_epoch_ms, resample
+from strategy import make_strategy
+from backtester import backtest_signals, calculate_metrics
+
+SHARED_FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+
+# ==========================================================
+# Parameter sampling
+# ==========================================================
+
+def grid(space):
+    """{'atr_multiplier': [1.0, 1.5], ...} -> every combination as a dict."""
+    for name, values in space.items():
+        if not isinstance(values, list):
+            raise ValueError(f"Grid search needs a list of values for '{name}'")
+    names = list(space)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(space[n] for n in names))]
+
+
+def random_search(space, n_iter, seed=None):
+    """
+    n_iter random combinations. A list is sampled from; a (low, high) tuple is a range
+    (integers if both bounds are ints, e.g. ema_trend_period=(100, 250)).
+    """
+    rng = np.random.default_rng(seed)
+    combos = []
+    for _ in range(n_iter):
+        params = {}
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                low, high = values
+                if isinstance(low, int) and isinstance(high, int):
+                    params[name] = int(rng.integers(low, high + 1))
+                else:
+                    params[name] = float(rng.uniform(low, high))
+            else:
+                params[name] = values[int(rng.integers(len(values)))]
+        combos.append(params)
+    return combos
+
+
+# ==========================================================
+# Worker side
+# ==========================================================
+
+_worker = {}  # per-process state: shm, df, df_mtf, indicator frames, signals
+
+
+def _attach(name, length, mtf_timeframe, initial_capital):
+    """Pool initializer: maps the shared OHLCV block (one DataFrame per worker, not per task)."""
+    shm = shared_memory.SharedMemory(name=name)  # the parent owns and unlinks the block
+    data = np.ndarray((len(SHARED_FIELDS), length), dtype=np.float64, buffer=shm.buf)
+    df = pd.DataFrame({'timestamp': pd.to_datetime(data[0].astype(np.int64), unit='ms'),
+                       **{field: data[i] for i, field in enumerate(SHARED_FIELDS) if i}})
+    _worker.update({
+        'shm': shm,
+        'df': df,
+        'df_mtf': resample(df, mtf_timeframe) if mtf_timeframe else None,
+        'initial_capital': initial_capital,
+        'indicators': {},  # (ema_trend_period, volume_ma_period) -> frame with indicators
+    })
+
+
+def _indicator_frame(strategy):
+    """apply_indicators result shared by every task with the same indicator settings."""
+    key = (strategy.ema_trend_period, strategy.volume_ma_period)
+    frames = _worker['indicators']
+    if key not in frames:
+        frames[key] = strategy.apply_indicators(_worker['df'].copy())
+    return frames[key]
+
+
+def _signals(strategy, params):
+    """generate_signals of the last parameter set (tasks are ordered so one set's windows are adjacent)."""
+    key = tuple(sorted(params.items()))
+    cached = _worker.get('signals')
+    if cached is None or cached[0] != key:
+        cached = (key, strategy.generate_signals(_indicator_frame(strategy), _worker['df_mtf']))
+        _worker['signals'] = cached
+    return cached[1]
+
+
+def _evaluate(task):
+    """(params, start, stop, detail) -> (metrics, (trades, equity) if detail else None)."""
+    params, start, stop, detail = task
+    strategy = make_strategy(params)
+    df = _indicator_frame(strategy)
+    signals = _signals(strategy, params)
+    trades, equity = backtest_signals(df, signals, _worker['initial_capital'], start=max(start, 200), stop=stop)
+    metrics = calculate_metrics(trades, equity, _worker['initial_capital'])
+    return metrics, ((trades, equity) if detail else None)
+
+
+# ==========================================================
+# Parent side
+# ==========================================================
+
+class SharedOHLCV:
+    """OHLCV columns of one frame copied once into a shared memory block."""
+
+    def __init__(self, df):
+        df = as_frame(df)
+        self.length = len(df)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, len(SHARED_FIELDS) * self.length * 8))
+        data = np.ndarray((len(SHARED_FIELDS), self.length), dtype=np.float64, buffer=self.shm.buf)
+        data[0] = to_epoch_ms(df['timestamp'])
+        for i, field in enumerate(SHARED_FIELDS[1:], start=1):
+            data[i] = df[field].to_numpy(dtype=np.float64)
+
+    def pool(self, mtf_timeframe=None, initial_capital=10000, max_workers=None):
+        self.workers = max_workers or config.SWEEP_WORKERS or os.cpu_count()
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_attach,
+                                   initargs=(self.shm.name, self.length, mtf_timeframe, initial_capital))
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_tasks(pool, tasks, workers):
+    """Maps tasks over the pool in chunks (results keep the task order)."""
+    chunksize = max(1, len(tasks) // (workers * 4))
+    return list(pool.map(_evaluate, tasks, chunksize=chunksize))
+
+
+def rank(combos, metrics, sort_by='return_pct'):
+    """Parameter sets and their calculate_metrics outputs as one table, best first."""
+    table = pd.concat([pd.DataFrame(combos), pd.DataFrame(metrics)], axis=1)
+    return table.sort_values(sort_by, ascending=False).reset_index(drop=True)
+
+
+def sweep(df, space, method='grid', n_iter=100, seed=None, mtf_timeframe=None,
+          initial_capital=10000, sort_by='return_pct', max_workers=None):
+    """
+    Backtests every parameter combination of space on df across all cores.
+    method: 'grid' (lists of values) or 'random' (n_iter samples; lists or (low, high) ranges).
+    mtf_timeframe: higher timeframe resampled from df for the MTF bias (None = NEUTRAL, like run_backtest).
+    Returns the ranked metrics table.
+    Call it under `if __name__ == "__main__":` (worker processes re-import the caller on Windows).
+    """
+    combos = grid(space) if method == 'grid' else random_search(space, n_iter, seed)
+    if not combos:
+        return pd.DataFrame()
+
+    with SharedOHLCV(df) as shared:
+        with shared.pool(mtf_timeframe, initial_capital, max_workers) as pool:
+            results = run_tasks(pool, [(params, 0, None, False) for params in combos], shared.workers)
+    return rank(combos, [metrics for metrics, _ in results], sort_by)
+
+
+# ==========================================================
+# Walk-forward optimization
+# ==========================================================
+
+def walk_forward_windows(length, train_bars, test_bars, anchored=False, start=200):
+    """
+    [(train_start, train_end, test_end)] bar ranges. Rolling windows keep train_bars of
+    history; anchored windows always train from `start`. The last test slice may be shorter.
+    """
+    windows = []
+    train_end = start + train_bars
+    while train_end < length:
+        train_start = start if anchored else train_end - train_bars
+        windows.append((train_start, train_end, min(train_end + test_bars, length)))
+        train_end += test_bars
+    return windows
+
+
+def walk_forward(df, space, train_bars, test_bars, anchored=False, method='grid', n_iter=100, seed=None,
+                 mtf_timeframe=None, initial_capital=10000, sort_by='return_pct', max_workers=None):
+    """
+    Optimizes on every train slice, trades the winner on the following test slice and
+    stitches the out-of-sample results together. All train runs (every window x combination)
+    go to the pool as one batch; indicators are computed once per worker on the whole series
+    and only sliced per window.
+    Returns {'windows': table per window, 'equity': stitched out-of-sample equity (Series),
+             'trades': out-of-sample trades, 'metrics': calculate_metrics of the stitched run}.
+    Positions still open at the end of a test slice are dropped, as at the end of run_backtest.
+    """
+    df = as_frame(df)
+    windows = walk_forward_windows(len(df), train_bars, test_bars, anchored)
+    combos = grid(space) if method == 'grid' else random_search(space, n_iter, seed)
+    if not windows or not combos:
+        return {'windows': pd.DataFrame(), 'equity': pd.Series(dtype=float), 'trades': [],
+                'metrics': calculate_metrics([], [initial_capital], initial_capital)}
+
+    with SharedOHLCV(df) as shared:
+        with shared.pool(mtf_timeframe, initial_capital, max_workers) as pool:
+            # 1. In-sample: every combination on every train slice
+            train_tasks = [(params, lo, hi, False) for params in combos for lo, hi, _ in windows]
+            train_results = run_tasks(pool, train_tasks, shared.workers)
+            table = pd.DataFrame([metrics for metrics, _ in train_results])
+            table['combo'] = np.repeat(np.arange(len(combos)), len(windows))
+            table['window'] = np.tile(np.arange(len(windows)), len(combos))
+            best = table.sort_values(sort_by, ascending=False, kind='stable').groupby('window').head(1)
+            best = best.set_index('window').sort_index()
+
+            # 2. Out-of-sample: each window's winner on its test slice
+            test_tasks = [(combos[best.loc[w, 'combo']], hi, end, True) for w, (_, hi, end) in enumerate(windows)]
+            test_results = run_tasks(pool, test_tasks, shared.workers)
+
+    # Chain the test slices: sizes are a fraction of capital, so a slice that starts
+    # with more capital scales its pnl by the same factor
+    timestamps = df['timestamp']
+    capital = float(initial_capital)
+    curve, curve_index, trades, rows = [initial_capital], [timestamps.iloc[windows[0][1] - 1]], [], []
+    for w, ((lo, hi, end), (metrics, (window_trades, equity))) in enumerate(zip(windows, test_results)):
+        scale = capital / initial_capital
+        trades.extend({**trade, 'pnl': trade['pnl'] * scale} for trade in window_trades)
+        curve.extend(value * scale for value in equity[1:])
+        curve_index.extend(timestamps.iloc[hi:end])
+        rows.append({
+            'train_start': timestamps.iloc[lo], 'test_start': timestamps.iloc[hi], 'test_end': timestamps.iloc[end - 1],
+            **combos[best.loc[w, 'combo']],
+            f'train_{sort_by}': best.loc[w, sort_by],
+            **{f'test_{name}': value for name, value in metrics.items()},
+        })
+        # The next slice starts from the realized capital (the dropped open position is not carried)
+        capital *= 1 + sum(trade['pnl'] for trade in window_trades) / initial_capital
+
+    equity = pd.Series(curve, index=curve_index)
+    return {
+        'windows': pd.DataFrame(rows),
+        'equity': equity,
+        'trades': trades,
+        'metrics': calculate_metrics(trades, curve, initial_capital),
+    }
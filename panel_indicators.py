@@ -0,0 +1,140 @@
+"""
+=======================================================
+Panel Indicators - Whole-Universe NumPy Kernel
+Indicators on (symbols x time) arrays: one pass for every symbol
+=======================================================
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from candles import as_frame
+
+OHLCV_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def stack(frames, length=None):
+    """
+    {symbol: OHLCV DataFrame or Candles} -> (symbols, {field: 2-D array}).
+    Rows are right-aligned on the latest candle; shorter histories are left-padded with NaN.
+    """
+    symbols = [s for s, df in frames.items() if df is not None and len(df) > 0]
+    length = length or max((len(frames[s]) for s in symbols), default=0)
+    panel = {field: np.full((len(symbols), length), np.nan) for field in OHLCV_FIELDS}
+    for i, symbol in enumerate(symbols):
+        df = frames[symbol].tail(length)
+        for field in OHLCV_FIELDS:
+            panel[field][i, length - len(df):] = np.asarray(df[field], dtype=float)
+    return symbols, panel
+
+
+def ema(x, span=None, alpha=None):
+    """pandas ewm(span|alpha, adjust=False).mean() along axis 1 (leading NaNs allowed)."""
+    alpha = alpha if alpha is not None else 2 / (span + 1)
+    x = np.asarray(x, dtype=float)
+    out = np.empty_like(x)
+    prev = np.full(x.shape[0], np.nan)
+    for t in range(x.shape[1]):
+        xt = x[:, t]
+        prev = np.where(np.isnan(prev), xt, np.where(np.isnan(xt), prev, prev + alpha * (xt - prev)))
+        out[:, t] = prev
+    return out
+
+
+def rolling_mean(x, window):
+    """pandas rolling(window).mean() along axis 1."""
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] >= window:
+        out[:, window - 1:] = sliding_window_view(x, window, axis=1).mean(axis=-1)
+    return out
+
+
+def rolling_std(x, window):
+    """pandas rolling(window).std() (ddof=1) along axis 1."""
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] >= window:
+        out[:, window - 1:] = sliding_window_view(x, window, axis=1).std(axis=-1, ddof=1)
+    return out
+
+
+def _diff(x):
+    out = np.full(x.shape, np.nan)
+    out[:, 1:] = x[:, 1:] - x[:, :-1]
+    return out
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """Returns (macd, signal_line, histogram)."""
+    line = ema(close, span=fast) - ema(close, span=slow)
+    signal_line = ema(line, span=signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(close, window=20, k=2):
+    """Returns (lower, middle, upper)."""
+    mid = rolling_mean(close, window)
+    std = rolling_std(close, window)
+    return mid - k * std, mid, mid + k * std
+
+
+def rsi(close, period=14, method='wilder'):
+    """
+    RSI along axis 1.
+    method='wilder': ewm(alpha=1/period) like Strategy.apply_indicators.
+    method='sma': simple rolling means like MarketScanner.calculate_rsi.
+    """
+    delta = _diff(close)
+    padding = np.isnan(close)
+    # Like pandas .where(): the first diff of each series counts as 0 gain / 0 loss
+    gain = np.where(padding, np.nan, np.where(delta > 0, delta, 0.0))
+    loss = np.where(padding, np.nan, np.where(delta < 0, -delta, 0.0))
+    if method == 'sma':
+        avg_gain, avg_loss = rolling_mean(gain, period), rolling_mean(loss, period)
+    else:
+        avg_gain, avg_loss = ema(gain, alpha=1 / period), ema(loss, alpha=1 / period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+def true_range(high, low, close):
+    prev_close = np.full(close.shape, np.nan)
+    prev_close[:, 1:] = close[:, :-1]
+    # fmax skips NaN like pandas max(axis=1): the first bar is high - low
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def atr(high, low, close, period=14, method='wilder'):
+    """ATR along axis 1 ('wilder' = Strategy, 'sma' = MarketScanner)."""
+    tr = true_range(high, low, close)
+    if method == 'sma':
+        return rolling_mean(tr, period)
+    return ema(tr, alpha=1 / period)
+
+
+def strategy_indicators(panel, ema_period=200, volume_period=20):
+    """All Strategy.apply_indicators columns for a stacked panel."""
+    close = panel['close']
+    macd_line, signal_line, hist = macd(close)
+    lower, _, upper = bollinger(close)
+    return {
+        'EMA_200': ema(close, span=ema_period),
+        'MACD': macd_line,
+        'MACD_Signal': signal_line,
+        'MACD_Hist': hist,
+        'BBL_20_2.0': lower,
+        'BBU_20_2.0': upper,
+        'RSI': rsi(close),
+        'ATR': atr(panel['high'], panel['low'], close),
+        'Volume_MA': rolling_mean(panel['volume'], volume_period),
+    }
+
+
+def unstack(frames, symbols, columns):
+    """Writes panel columns back onto copies of the per-symbol frames (stacked without a length cap)."""
+    out = {}
+    for i, symbol in enumerate(symbols):
+        df = as_frame(frames[symbol]).copy()
+        n = len(df)
+        for name, values in columns.items():
+            df[name] = values[i, values.shape[1] - n:]
+        out[symbol] = df
+    return out
@@ -0,0 +1,151 @@
+"""
+=======================================================
+Portfolio Backtest - All Pairs, One Capital Pool
+Production risk rules (RiskManager sizing, max positions,
+daily loss limit) on a shared timeline
+=======================================================
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import config
+from candles import as_frame
+from resampler import resample, to_epoch_ms
+from strategy import Strategy
+from risk_manager import RiskManager
+from backtest_engine import signal_direction, LONG
+from backtester import calculate_metrics
+
+
+def symbol_signals(strategy, df, mtf_timeframe=None):
+    """Indicators + generate_signals for one symbol (the MTF frame is resampled like bot_main does)."""
+    df = strategy.apply_indicators(as_frame(df))
+    df_mtf = resample(df, mtf_timeframe) if mtf_timeframe else None
+    signals = strategy.generate_signals(df, df_mtf)
+    return {
+        'timestamp': to_epoch_ms(df['timestamp']),
+        'high': df['high'].to_numpy(dtype=float),
+        'low': df['low'].to_numpy(dtype=float),
+        'close': df['close'].to_numpy(dtype=float),
+        'direction': signal_direction(signals['signal'].to_numpy()),
+        'entry': signals['entry'].to_numpy(),
+        'stop_loss': signals['stop_loss'].to_numpy(),
+        'take_profit': signals['take_profit'].to_numpy(),
+    }
+
+
+def _align(per_symbol, symbols):
+    """Puts every symbol on the union timeline: (timeline, {field: symbols x time array})."""
+    timeline = np.unique(np.concatenate([per_symbol[s]['timestamp'] for s in symbols]))
+    panel = {field: np.full((len(symbols), len(timeline)), np.nan)
+             for field in ('high', 'low', 'close', 'entry', 'stop_loss', 'take_profit')}
+    panel['direction'] = np.zeros((len(symbols), len(timeline)), dtype=np.int8)
+    for i, symbol in enumerate(symbols):
+        data = per_symbol[symbol]
+        pos = np.searchsorted(timeline, data['timestamp'])
+        for field in panel:
+            panel[field][i, pos] = data[field]
+    # Mark-to-market uses the last known close while a market has no candle
+    panel['last_close'] = pd.DataFrame(panel['close']).ffill(axis=1).to_numpy()
+    return timeline, panel
+
+
+def run_portfolio_backtest(frames, strategy=None, risk_manager=None, initial_capital=None,
+                           mtf_timeframe=None, max_workers=None):
+    """
+    frames: {symbol: OHLCV DataFrame or Candles} on the same timeframe.
+    Signals are generated per symbol concurrently; the simulation then walks the shared
+    timeline: exits (SL first, then TP) before entries, entries gated by
+    RiskManager.can_open_position and sized by RiskManager.calculate_position_size,
+    capped by the capital not already committed to open positions.
+    Returns {'equity': Series, 'trades': [...], 'rejected': signals blocked by the limits, 'metrics': {...}}.
+    """
+    strategy = strategy or Strategy()
+    initial_capital = initial_capital or config.TRADING_CAPITAL
+    mtf_timeframe = mtf_timeframe if mtf_timeframe is not None else config.MTF_TIMEFRAME
+    symbols = [s for s, df in frames.items() if df is not None and len(df) > 0]
+    if not symbols:
+        return {'equity': pd.Series(dtype=float), 'trades': [], 'rejected': 0,
+                'metrics': calculate_metrics([], [initial_capital], initial_capital)}
+
+    with ThreadPoolExecutor(max_workers=max_workers or config.FETCH_WORKERS) as pool:
+        results = pool.map(lambda s: symbol_signals(strategy, frames[s], mtf_timeframe), symbols)
+        per_symbol = dict(zip(symbols, results))
+
+    timeline, panel = _align(per_symbol, symbols)
+    high, low, direction = panel['high'], panel['low'], panel['direction']
+    dates = pd.to_datetime(timeline, unit='ms').date
+    risk_manager = risk_manager or RiskManager(initial_capital=initial_capital, start_date=dates[0])
+    signal_bars = direction.any(axis=0)
+
+    capital = float(initial_capital)   # realized
+    positions = {}                     # symbol index -> {type, entry, sl, tp, size, entry_time}
+    trades, equity, rejected = [], np.empty(len(timeline)), 0
+
+    for t in range(len(timeline)):
+        # 1. Exits
+        for i in list(positions):
+            pos = positions[i]
+            if np.isnan(high[i, t]):
+                continue
+            if pos['type'] == LONG:
+                hit_sl, hit_tp = low[i, t] <= pos['sl'], high[i, t] >= pos['tp']
+            else:
+                hit_sl, hit_tp = high[i, t] >= pos['sl'], low[i, t] <= pos['tp']
+            if hit_sl or hit_tp:
+                exit_price = pos['sl'] if hit_sl else pos['tp']
+                pnl = pos['type'] * (exit_price - pos['entry']) * pos['size']
+                capital += pnl
+                risk_manager.check_daily_loss_limit(dates[t])  # rolls the day before booking
+                risk_manager.update_daily_pnl(pnl)
+                trades.append({
+                    'symbol': symbols[i],
+                    'entry_time': pos['entry_time'],
+                    'exit_time': timeline[t],
+                    'type': 'BUY' if pos['type'] == LONG else 'SELL',
+                    'entry': pos['entry'],
+                    'exit': exit_price,
+                    'size': pos['size'],
+                    'pnl': pnl,
+                    'exit_reason': 'SL' if hit_sl else 'TP',
+                })
+                del positions[i]
+
+        # 2. Entries (same checks as bot_main.analyze_symbol)
+        if signal_bars[t]:
+            for i in np.flatnonzero(direction[:, t]):
+                if i in positions:
+                    continue
+                if not risk_manager.can_open_position(len(positions), today=dates[t], verbose=False):
+                    rejected += 1
+                    continue
+                entry, stop_loss = panel['entry'][i, t], panel['stop_loss'][i, t]
+                size = risk_manager.calculate_position_size(entry, stop_loss)
+                # One capital pool: only what open positions do not already use is available
+                available = capital - sum(p['entry'] * p['size'] for p in positions.values())
+                if size * entry > available:
+                    size = round(max(available, 0) * 0.95 / entry, 6)
+                if size <= 0:
+                    rejected += 1
+                    continue
+                positions[i] = {
+                    'type': int(direction[i, t]), 'entry': entry, 'sl': stop_loss,
+                    'tp': panel['take_profit'][i, t], 'size': size, 'entry_time': timeline[t],
+                }
+
+        # 3. Mark-to-market
+        unrealized = sum(p['type'] * (panel['last_close'][i, t] - p['entry']) * p['size'] for i, p in positions.items())
+        equity[t] = capital + unrealized
+
+    times = pd.to_datetime(timeline, unit='ms')
+    for trade in trades:
+        trade['entry_time'] = pd.to_datetime(trade['entry_time'], unit='ms')
+        trade['exit_time'] = pd.to_datetime(trade['exit_time'], unit='ms')
+    curve = [initial_capital] + equity.tolist()
+    return {
+        'equity': pd.Series(equity, index=times),
+        'trades': trades,
+        'rejected': rejected,
+        'metrics': calculate_metrics(trades, curve, initial_capital),
+    }
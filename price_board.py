@@ -0,0 +1,80 @@
+import asyncio
+import time
+from loguru import logger
+
+
+class PriceBoard:
+    """
+    Shared ticker cache for the Telegram bot.
+    All watched symbols are refreshed with a single fetch_tickers call per tick,
+    so exchange calls stay constant no matter how many alerts or positions exist.
+    """
+
+    def __init__(self, exchange, max_age=1.0, stale_after=None):
+        self.exchange = exchange
+        self.max_age = max_age  # seconds before a cached ticker is considered stale
+        # seconds after which last() stops serving a ticker (refreshes failing, e.g. an exchange outage)
+        self.stale_after = stale_after if stale_after is not None else 10 * max_age
+        self.tickers = {}
+        self.fetched_at = {}
+        self._expired = set()  # symbols already reported as too old
+        self._lock = asyncio.Lock()
+
+    def _stale(self, symbols):
+        now = time.time()
+        return [s for s in symbols if now - self.fetched_at.get(s, 0) > self.max_age]
+
+    async def _fetch(self, symbols):
+        # Unknown symbols would fail the whole batch, so drop them when markets are loaded
+        if self.exchange.markets:
+            unknown = [s for s in symbols if s not in self.exchange.markets]
+            if unknown:
+                logger.warning(f"PriceBoard: ignoring unknown symbols {unknown}")
+            symbols = [s for s in symbols if s in self.exchange.markets]
+        if not symbols:
+            return
+
+        tickers = await self.exchange.fetch_tickers(symbols)
+        now = time.time()
+        for symbol, ticker in tickers.items():
+            self.tickers[symbol] = ticker
+            self.fetched_at[symbol] = now
+            self._expired.discard(symbol)
+
+    async def get_tickers(self, symbols):
+        """Returns {symbol: ticker}, fetching only stale/missing symbols in one batch."""
+        symbols = list(dict.fromkeys(symbols))
+        async with self._lock:
+            stale = self._stale(symbols)
+            if stale:
+                await self._fetch(stale)
+        return {s: self.tickers[s] for s in symbols if s in self.tickers}
+
+    async def refresh(self, symbols):
+        """Called once per tick with every symbol the bot is watching."""
+        try:
+            await self.get_tickers(symbols)
+        except Exception as e:
+            logger.error(f"PriceBoard refresh error: {e}")
+
+    async def get_price(self, symbol):
+        tickers = await self.get_tickers([symbol])
+        if symbol not in tickers:
+            raise ValueError(f"No ticker for {symbol}")
+        return tickers[symbol]['last']
+
+    def last(self, symbol):
+        """
+        Cached last price (no network). None if the symbol was never fetched or its ticker
+        is older than stale_after, so stops and alerts skip the cycle instead of acting on old prices.
+        """
+        ticker = self.tickers.get(symbol)
+        if not ticker:
+            return None
+        age = time.time() - self.fetched_at.get(symbol, 0)
+        if age > self.stale_after:
+            if symbol not in self._expired:
+                self._expired.add(symbol)
+                logger.warning(f"PriceBoard: {symbol} price is {age:.0f}s old, skipping until a refresh succeeds")
+            return None
+        return ticker['last']
@@ -0,0 +1,223 @@
+"""
+=======================================================
+Rate Limiter - Shared Exchange Request Scheduler
+One weight-aware token bucket for every process on this machine
+(bot_main, bot, dashboard, mcp_server), stored in SQLite
+=======================================================
+"""
+
+import os
+import time
+import sqlite3
+import asyncio
+import threading
+import ccxt
+import config
+
+# Lower value = served first
+PRIORITIES = {'order': 0, 'tick': 1, 'analytics': 2}
+
+# A waiter that has not polled for this long belongs to a dead process
+WAITER_TIMEOUT = 5.0
+
+TICK_PATHS = ('ticker', 'price', 'bookTicker', 'depth', 'trades')
+
+
+class RateLimiter:
+    """
+    Cross-process token bucket.
+    Tokens are ccxt cost units (the same units ccxt's own throttle uses),
+    refilled at 1000 / rateLimit per second.
+    Waiting requests are queued in a table and served by priority, then arrival order.
+    """
+
+    def __init__(self, path=None, refill_rate=20.0, capacity=None):
+        self.path = path or config.RATE_LIMIT_DB
+        self.refill_rate = refill_rate           # tokens per second
+        self.capacity = capacity or refill_rate  # burst size (1 second by default)
+        self._local = threading.local()
+        self._init_db()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        conn = self._conn()
+        conn.execute('''CREATE TABLE IF NOT EXISTS bucket (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            tokens REAL,
+            updated REAL,
+            blocked_until REAL DEFAULT 0
+        )''')
+        conn.execute('''CREATE TABLE IF NOT EXISTS waiters (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            priority INTEGER,
+            weight REAL,
+            pid INTEGER,
+            seen REAL
+        )''')
+        conn.execute('''CREATE TABLE IF NOT EXISTS usage (
+            endpoint TEXT,
+            minute INTEGER,
+            weight REAL,
+            calls INTEGER,
+            PRIMARY KEY (endpoint, minute)
+        )''')
+        conn.execute('INSERT OR IGNORE INTO bucket (id, tokens, updated) VALUES (1, ?, ?)',
+                     (self.capacity, time.time()))
+
+    def acquire(self, weight=1, priority='analytics', endpoint=None):
+        """Blocks until `weight` tokens are granted to this request."""
+        conn = self._conn()
+        level = PRIORITIES.get(priority, PRIORITIES['analytics'])
+        waiter_id = conn.execute('INSERT INTO waiters (priority, weight, pid, seen) VALUES (?, ?, ?, ?)',
+                                 (level, weight, os.getpid(), time.time())).lastrowid
+        try:
+            while True:
+                delay = self._try_take(conn, waiter_id, weight, endpoint)
+                if delay is None:
+                    return
+                time.sleep(delay)
+        finally:
+            conn.execute('DELETE FROM waiters WHERE id = ?', (waiter_id,))
+
+    def _try_take(self, conn, waiter_id, weight, endpoint):
+        """One scheduling round. Returns None when granted, else seconds to sleep."""
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('UPDATE waiters SET seen = ? WHERE id = ?', (now, waiter_id))
+            conn.execute('DELETE FROM waiters WHERE seen < ?', (now - WAITER_TIMEOUT,))
+
+            tokens, updated, blocked_until = conn.execute(
+                'SELECT tokens, updated, blocked_until FROM bucket WHERE id = 1').fetchone()
+            tokens = min(self.capacity, tokens + (now - updated) * self.refill_rate)
+            conn.execute('UPDATE bucket SET tokens = ?, updated = ? WHERE id = 1', (tokens, now))
+
+            if now < blocked_until:
+                conn.execute('COMMIT')
+                return min(blocked_until - now, 1.0)
+
+            head = conn.execute('SELECT id FROM waiters ORDER BY priority, id LIMIT 1').fetchone()
+            if head is None or head[0] != waiter_id:
+                conn.execute('COMMIT')
+                return 0.01
+
+            # Heavier than the burst size: let it through once the bucket is full
+            needed = min(weight, self.capacity)
+            if tokens < needed:
+                conn.execute('COMMIT')
+                return max(0.005, (needed - tokens) / self.refill_rate)
+
+            conn.execute('UPDATE bucket SET tokens = ? WHERE id = 1', (tokens - weight,))
+            if endpoint:
+                conn.execute('''INSERT INTO usage (endpoint, minute, weight, calls) VALUES (?, ?, ?, 1)
+                    ON CONFLICT (endpoint, minute) DO UPDATE SET weight = weight + excluded.weight, calls = calls + 1''',
+                             (endpoint, int(now // 60), weight))
+            conn.execute('COMMIT')
+            return None
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def pause(self, seconds):
+        """Stops every process from sending requests (e.g. after a 429/418)."""
+        conn = self._conn()
+        conn.execute('UPDATE bucket SET blocked_until = MAX(blocked_until, ?), tokens = 0 WHERE id = 1',
+                     (time.time() + seconds,))
+
+    def usage_report(self, minutes=1):
+        """{endpoint: {'weight', 'calls'}} over the last `minutes` minutes (all processes)."""
+        conn = self._conn()
+        since = int(time.time() // 60) - minutes + 1
+        conn.execute('DELETE FROM usage WHERE minute < ?', (since - 60,))
+        rows = conn.execute('''SELECT endpoint, SUM(weight), SUM(calls) FROM usage
+            WHERE minute >= ? GROUP BY endpoint ORDER BY SUM(weight) DESC''', (since,)).fetchall()
+        return {endpoint: {'weight': weight, 'calls': calls} for endpoint, weight, calls in rows}
+
+
+_limiters = {}
+
+
+def get_limiter(exchange):
+    """One limiter per exchange id (binance and binanceus have separate IP limits)."""
+    key = exchange.id
+    if key not in _limiters:
+        refill_rate = 1000 / exchange.rateLimit
+        base, ext = os.path.splitext(config.RATE_LIMIT_DB)
+        path = f"{base}_{key}{ext}"
+        _limiters[key] = RateLimiter(path, refill_rate=refill_rate)
+    return _limiters[key]
+
+
+def classify(path, method):
+    """Maps an API call to a scheduling priority."""
+    if 'order' in path.lower() and method in ('POST', 'DELETE', 'PUT'):
+        return 'order'
+    if any(p in path for p in TICK_PATHS):
+        return 'tick'
+    return 'analytics'
+
+
+def install_rate_limiter(exchange):
+    """
+    Routes every request of a ccxt exchange (sync or async_support) through the shared limiter.
+    Replaces ccxt's per-instance throttle.
+    Returns the limiter, or None if disabled in config.
+    """
+    if not config.RATE_LIMIT_ENABLED:
+        return None
+
+    limiter = get_limiter(exchange)
+    original_fetch2 = exchange.fetch2
+    exchange.enableRateLimit = False
+
+    def prepare(path, api, method, params, cfg):
+        cost = exchange.calculate_rate_limiter_cost(api, method, path, params, cfg or {})
+        endpoint = f"{api} {method} {path}"
+        return cost, classify(path, method), endpoint
+
+    def on_error(e):
+        # Banned or throttled: back off in every process, not just this one
+        if isinstance(e, ccxt.DDoSProtection):
+            limiter.pause(config.RATE_LIMIT_BACKOFF)
+
+    if asyncio.iscoroutinefunction(original_fetch2):
+        async def fetch2(path, api='public', method='GET', params={}, headers=None, body=None, cfg={}):
+            cost, priority, endpoint = prepare(path, api, method, params, cfg)
+            await asyncio.get_running_loop().run_in_executor(None, limiter.acquire, cost, priority, endpoint)
+            try:
+                return await original_fetch2(path, api, method, params, headers, body, cfg)
+            except Exception as e:
+                on_error(e)
+                raise
+    else:
+        def fetch2(path, api='public', method='GET', params={}, headers=None, body=None, cfg={}):
+            cost, priority, endpoint = prepare(path, api, method, params, cfg)
+            limiter.acquire(cost, priority, endpoint)
+            try:
+                return original_fetch2(path, api, method, params, headers, body, cfg)
+            except Exception as e:
+                on_error(e)
+                raise
+
+    exchange.fetch2 = fetch2
+    return limiter
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Usage: python rate_limiter.py [binance|binanceus]
+    exchange_id = sys.argv[1] if len(sys.argv) > 1 else ('binanceus' if config.BINANCE_USE_US else 'binance')
+    limiter = get_limiter(getattr(ccxt, exchange_id)())
+    report = limiter.usage_report(minutes=1)
+    print(f"📊 Request weight used in the last minute ({exchange_id}):")
+    for endpoint, stats in report.items():
+        print(f"  {endpoint:<45} {stats['weight']:>8.1f}  ({stats['calls']} calls)")
+    print(f"  {'TOTAL':<45} {sum(s['weight'] for s in report.values()):>8.1f}")
@@ -0,0 +1,159 @@
+"""
+=======================================================
+Resampler - Higher Timeframes from Base Candles
+Builds 4h / 1d / 1w bars from stored lower-timeframe candles
+=======================================================
+"""
+
+from collections import deque
+import numpy as np
+import pandas as pd
+
+UNIT_MS = {'m': 60_000, 'h': 3_600_000, 'd': 86_400_000, 'w': 604_800_000}
+# Epoch (1970-01-01) is a Thursday; exchanges open weekly candles on Monday 00:00 UTC
+WEEK_OFFSET_MS = 4 * 86_400_000
+
+
+def timeframe_to_ms(timeframe):
+    """'15m' -> 900000, '4h' -> 14400000, '1w' -> 604800000"""
+    amount, unit = int(timeframe[:-1]), timeframe[-1]
+    if unit not in UNIT_MS:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return amount * UNIT_MS[unit]
+
+
+def bucket_start(ts_ms, timeframe):
+    """Start (epoch ms, UTC) of the higher-timeframe bar that contains ts_ms. Works on scalars and arrays."""
+    tf_ms = timeframe_to_ms(timeframe)
+    offset = WEEK_OFFSET_MS if timeframe.endswith('w') else 0
+    return (ts_ms - offset) // tf_ms * tf_ms + offset
+
+
+def base_limit(timeframe, limit, higher_timeframe, higher_limit):
+    """Base candles needed to serve `limit` base bars and `higher_limit` complete higher bars."""
+    ratio = timeframe_to_ms(higher_timeframe) // timeframe_to_ms(timeframe)
+    if ratio < 1:
+        raise ValueError(f"{higher_timeframe} is not higher than {timeframe}")
+    # +1 bucket because a partial first bucket is dropped
+    return max(limit, (higher_limit + 1) * ratio)
+
+
+def to_epoch_ms(timestamps):
+    """Timestamp column (datetime, tz-aware datetime or epoch ms) -> int64 epoch ms (UTC)."""
+    if pd.api.types.is_datetime64_any_dtype(timestamps):
+        ts = pd.to_datetime(timestamps, utc=True)
+        return np.asarray((ts - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(milliseconds=1), dtype='int64')
+    return np.asarray(timestamps, dtype='int64')
+
+
+def resample(df, timeframe, drop_partial_first=True):
+    """
+    Aggregates a base OHLCV frame (sorted by timestamp) into `timeframe` bars aligned to UTC boundaries.
+    The last bar may still be open (like the exchange's own live candle).
+    The first bar is dropped if the base data starts mid-bucket.
+    """
+    if df is None or df.empty:
+        return df
+
+    ts = to_epoch_ms(df['timestamp'])
+    buckets = bucket_start(ts, timeframe)
+    starts, first_idx = np.unique(buckets, return_index=True)
+
+    out = pd.DataFrame({
+        'timestamp': starts,
+        'open': df['open'].to_numpy()[first_idx],
+        'high': np.maximum.reduceat(df['high'].to_numpy(), first_idx),
+        'low': np.minimum.reduceat(df['low'].to_numpy(), first_idx),
+        'close': df['close'].to_numpy()[np.append(first_idx[1:], len(df)) - 1],
+        'volume': np.add.reduceat(df['volume'].to_numpy(), first_idx),
+    })
+
+    if drop_partial_first and len(out) > 0 and ts[0] != starts[0]:
+        out = out.iloc[1:].reset_index(drop=True)
+
+    # Return timestamps in the same representation as the input
+    if pd.api.types.is_datetime64_any_dtype(df['timestamp']):
+        stamps = pd.to_datetime(out['timestamp'], unit='ms', utc=True)
+        tz = getattr(df['timestamp'].dt, 'tz', None)
+        out['timestamp'] = stamps.dt.tz_convert(tz) if tz is not None else stamps.dt.tz_localize(None)
+    out.attrs = {**df.attrs, 'timeframe': timeframe}
+    return out
+
+
+class Resampler:
+    """
+    Incremental higher-timeframe builder for streaming.
+    Keeps the completed bars plus the base candles of the open bar per symbol,
+    so each new (or revised) base candle updates the open bar in O(1).
+    """
+
+    def __init__(self, timeframe, max_bars=500):
+        self.timeframe = timeframe
+        self.max_bars = max_bars
+        self.completed = {}   # symbol -> deque of [ts, o, h, l, c, v]
+        self.open_rows = {}   # symbol -> {base_ts: row} of the open bucket
+        self.open_start = {}  # symbol -> bucket start of the open bar
+
+    def seed(self, symbol, df_base):
+        """Initialize from a base frame (e.g. the stored 1h history)."""
+        bars = resample(df_base, self.timeframe)
+        self.completed[symbol] = deque(maxlen=self.max_bars)
+        self.open_rows[symbol] = {}
+        self.open_start[symbol] = None
+        if bars is None or bars.empty:
+            return
+
+        bar_ts = to_epoch_ms(bars['timestamp'])
+        for ts, row in zip(bar_ts[:-1], bars.iloc[:-1].itertuples(index=False)):
+            self.completed[symbol].append([int(ts), row.open, row.high, row.low, row.close, row.volume])
+
+        # Keep the raw base candles of the still-open bar
+        last_start = int(bar_ts[-1])
+        base_ts = to_epoch_ms(df_base['timestamp'])
+        in_open = bucket_start(base_ts, self.timeframe) == last_start
+        for ts, row in zip(base_ts[in_open], df_base[in_open].itertuples(index=False)):
+            self.open_rows[symbol][int(ts)] = [int(ts), row.open, row.high, row.low, row.close, row.volume]
+        self.open_start[symbol] = last_start
+
+    def update(self, symbol, row):
+        """Apply one base candle [ts, o, h, l, c, v] (new or a revision of the latest one)."""
+        ts = int(row[0])
+        start = int(bucket_start(ts, self.timeframe))
+        if symbol not in self.completed:
+            self.completed[symbol] = deque(maxlen=self.max_bars)
+            self.open_rows[symbol] = {}
+            self.open_start[symbol] = None
+
+        current = self.open_start[symbol]
+        if current is not None and start < current:
+            return  # late candle for a bar that is already closed
+        if current is not None and start > current:
+            self.completed[symbol].append(self._open_bar(symbol))
+            self.open_rows[symbol] = {}
+        self.open_start[symbol] = start
+        self.open_rows[symbol][ts] = list(row[:6])
+
+    def _open_bar(self, symbol):
+        rows = [self.open_rows[symbol][k] for k in sorted(self.open_rows[symbol])]
+        return [
+            self.open_start[symbol],
+            rows[0][1],
+            max(r[2] for r in rows),
+            min(r[3] for r in rows),
+            rows[-1][4],
+            sum(r[5] for r in rows),
+        ]
+
+    def frame(self, symbol, limit=None):
+        """Completed bars plus the open bar, in fetch_data format."""
+        bars = list(self.completed.get(symbol, []))
+        if self.open_rows.get(symbol):
+            bars.append(self._open_bar(symbol))
+        if limit is not None:
+            bars = bars[-limit:]
+        if not bars:
+            return None
+        df = pd.DataFrame(bars, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        df.attrs = {'symbol': symbol, 'timeframe': self.timeframe}
+        return df
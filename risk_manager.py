@@ -9,14 +9,14 @@ import config
 from datetime import datetime, timedelta
 
 class RiskManager:
-    def __init__(self, initial_capital=10000):
+    def __init__(self, initial_capital=10000, start_date=None):
         self.capital = initial_capital
         self.max_risk_per_trade = 0.02  # 2% per trade
         self.max_daily_loss = 0.05  # 5% max daily loss
         self.max_positions = 3
         
         self.daily_pnl = 0
-        self.daily_reset_time = datetime.now().date()
+        self.daily_reset_time = start_date or datetime.now().date()
         
     def calculate_position_size(self, entry_price, stop_loss_price, balance=None):
         """
@@ -45,14 +45,16 @@ class RiskManager:
             
         return round(position_size, 6)
     
-    def check_daily_loss_limit(self):
+    def check_daily_loss_limit(self, today=None):
         """
         Check if daily loss limit has been reached.
+        today: trading date (defaults to now; backtests pass the candle's date).
         """
-        # Reset daily tracking if new day
-        if datetime.now().date() > self.daily_reset_time:
+        today = today or datetime.now().date()
+        # Reset daily tracking if new day (any other date: backtests replay past days)
+        if today != self.daily_reset_time:
             self.daily_pnl = 0
-            self.daily_reset_time = datetime.now().date()
+            self.daily_reset_time = today
         
         max_loss = self.capital * self.max_daily_loss
         
@@ -84,18 +86,20 @@ class RiskManager:
             'percentage': round(exposure_pct, 2)
         }
     
-    def can_open_position(self, active_positions_count):
+    def can_open_position(self, active_positions_count, today=None, verbose=True):
         """
         Check if we can open a new position based on limits.
         """
         # Check daily loss limit
-        if self.check_daily_loss_limit():
-            print("⚠️ Daily loss limit reached. No new positions allowed.")
+        if self.check_daily_loss_limit(today):
+            if verbose:
+                print("⚠️ Daily loss limit reached. No new positions allowed.")
             return False
         
         # Check max positions
         if active_positions_count >= self.max_positions:
-            print(f"⚠️ Max positions ({self.max_positions}) reached.")
+            if verbose:
+                print(f"⚠️ Max positions ({self.max_positions}) reached.")
             return False
         
         return True
@@ -0,0 +1,183 @@
+"""
+=======================================================
+Rules - Declarative Signal Conditions
+"close > EMA_200 and MACD > MACD_Signal and volume > 1.5 * Volume_MA"
+compiled once to NumPy boolean expressions over indicator columns
+=======================================================
+"""
+
+import ast
+import operator
+import re
+from functools import lru_cache, reduce
+import numpy as np
+import indicators
+from candles import as_frame
+
+_COMPARE = {
+    ast.Gt: operator.gt, ast.GtE: operator.ge, ast.Lt: operator.lt, ast.LtE: operator.le,
+    ast.Eq: operator.eq, ast.NotEq: operator.ne,
+}
+_ARITHMETIC = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.Pow: operator.pow,
+}
+# Column names that are not Python identifiers are written in backticks: `BBL_20_2.0`
+_QUOTED = re.compile(r'`([^`]+)`')
+
+
+def _shift(x, n):
+    """Value n bars earlier along the last axis (NaN before the first bar)."""
+    if np.ndim(x) == 0:
+        return x
+    out = np.full(np.shape(x), np.nan)
+    if n < np.shape(x)[-1]:
+        out[..., n:] = x[..., :-n]
+    return out
+
+
+class Rule:
+    """
+    A compiled rule. Names resolve, in order, to keyword values passed by the caller
+    (e.g. mtf_bias), frame columns, numeric params (e.g. volume_spike_multiplier)
+    and finally indicators from the registry (e.g. EMA_50, RSI_SMA_14).
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.names = []
+        self.lag = 0  # deepest prev() offset, so last() only evaluates that many rows
+        quoted = {}
+
+        def quote(match):
+            placeholder = f'__col{len(quoted)}'
+            quoted[placeholder] = match.group(1)
+            return placeholder
+
+        try:
+            tree = ast.parse(_QUOTED.sub(quote, text).strip(), mode='eval')
+        except SyntaxError as e:
+            raise ValueError(f"Invalid rule: {text!r} ({e.msg})") from None
+        self._quoted = quoted
+        self._fn = self._compile(tree.body)
+
+    def _compile(self, node):
+        if isinstance(node, ast.BoolOp):
+            op = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            parts = [self._compile(value) for value in node.values]
+            return lambda env: reduce(op, (part(env) for part in parts))
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.USub)):
+            operand = self._compile(node.operand)
+            if isinstance(node.op, ast.Not):
+                return lambda env: np.logical_not(operand(env))
+            return lambda env: -operand(env)
+
+        if isinstance(node, ast.BinOp) and type(node.op) in _ARITHMETIC:
+            op = _ARITHMETIC[type(node.op)]
+            left, right = self._compile(node.left), self._compile(node.right)
+            return lambda env: op(left(env), right(env))
+
+        if isinstance(node, ast.Compare):
+            # Chained comparisons (a < b < c) are and-ed pairwise
+            operands = [self._compile(node.left)] + [
+                None if isinstance(op_node, (ast.In, ast.NotIn)) else self._compile(c)
+                for op_node, c in zip(node.ops, node.comparators)
+            ]
+            pairs = []
+            for i, op_node in enumerate(node.ops):
+                left, right = operands[i], operands[i + 1]
+                if isinstance(op_node, (ast.In, ast.NotIn)):
+                    values = node.comparators[i]
+                    if not isinstance(values, (ast.Tuple, ast.List)):
+                        raise ValueError(f"'in' needs a literal list in rule: {self.text!r}")
+                    choices = [ast.literal_eval(v) for v in values.elts]
+                    negate = isinstance(op_node, ast.NotIn)
+                    pairs.append(lambda env, left=left, choices=choices, negate=negate:
+                                 np.isin(left(env), choices, invert=negate))
+                elif type(op_node) in _COMPARE:
+                    op = _COMPARE[type(op_node)]
+                    pairs.append(lambda env, op=op, left=left, right=right: op(left(env), right(env)))
+                else:
+                    raise ValueError(f"Unsupported comparison in rule: {self.text!r}")
+            return lambda env: reduce(np.logical_and, (pair(env) for pair in pairs))
+
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            name = node.func.id
+            if name == 'abs' and len(node.args) == 1:
+                arg = self._compile(node.args[0])
+                return lambda env: np.abs(arg(env))
+            if name == 'prev' and len(node.args) in (1, 2):
+                arg = self._compile(node.args[0])
+                n = ast.literal_eval(node.args[1]) if len(node.args) == 2 else 1
+                if not isinstance(n, int) or n < 1:
+                    raise ValueError(f"prev() needs a positive integer offset in rule: {self.text!r}")
+                self.lag = max(self.lag, n)
+                return lambda env: _shift(arg(env), n)
+            raise ValueError(f"Unknown function '{name}' in rule: {self.text!r}")
+
+        if isinstance(node, ast.Name):
+            name = self._quoted.get(node.id, node.id)
+            if name not in self.names:
+                self.names.append(name)
+            return lambda env: env[name]
+
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, str)):
+            value = node.value
+            return lambda env: value
+
+        raise ValueError(f"Unsupported syntax '{ast.dump(node)[:40]}' in rule: {self.text!r}")
+
+    def _env(self, df, params, values, window=None, bar=None):
+        """Arrays (or only the last `window` bars) for every name the rule reads."""
+        # Reading a few rows once is much cheaper than slicing every column
+        if window is None:
+            rows = df
+        elif window == 1:
+            rows = bar if bar is not None else df.iloc[-1]
+        else:
+            rows = df.iloc[-window:]
+        single = window == 1
+        columns = rows.index if single else rows.columns
+
+        env, missing = {}, []
+        for name in self.names:
+            if name in values:
+                env[name] = values[name]
+            elif name in columns:
+                env[name] = rows[name] if single else rows[name].to_numpy()
+            elif params and name in params:
+                env[name] = params[name]
+            else:
+                missing.append(name)
+        if missing:
+            env.update({name: series.to_numpy() for name, series in indicators.compute(df, missing).items()})
+        if window is not None:
+            env = {name: value[-window:] if np.ndim(value) else value for name, value in env.items()}
+        return env
+
+    def mask(self, df, params=None, **values):
+        """Boolean array over every bar of df (full-history backtests)."""
+        df = as_frame(df)
+        result = self._fn(self._env(df, params, values))
+        return np.broadcast_to(np.asarray(result, dtype=bool), (len(df),))
+
+    def last(self, df, params=None, bar=None, **values):
+        """
+        Rule value on the latest bar only (live signals).
+        bar: df.iloc[-1], when the caller already has it.
+        """
+        df = as_frame(df)
+        if len(df) == 0:
+            return False
+        result = self._fn(self._env(df, params, values, window=self.lag + 1, bar=bar))
+        return bool(result[-1]) if np.ndim(result) else bool(result)
+
+    def __repr__(self):
+        return f"Rule({self.text!r})"
+
+
+@lru_cache(maxsize=256)
+def compile_rule(text):
+    """Compiled (and memoized) Rule for a rule string."""
+    return Rule(text)
@@ -4,11 +4,16 @@ import asyncio
 import aiohttp
 from loguru import logger
 from config import config
+import panel_indicators
+import indicators
+from candles import Candles
+from leaderboard import Leaderboard
 
 class MarketScanner:
     def __init__(self, exchange):
         self.exchange = exchange
         self.project_cache = {}
+        self.boards = {}  # timeframe -> Leaderboard
 
     async def get_project_fundamental(self, symbol):
         """جلب بيانات المشروع الأساسية (الوصف، المطورين، الحماية)."""
@@ -95,40 +100,15 @@ class MarketScanner:
         except:
             return False
 
-    def calculate_atr(self, df, period=14):
-        """حساب متوسط النطاق الحقيقي (ATR) لقياس التقلب."""
-        try:
-            high = df['high']
-            low = df['low']
-            close = df['close']
-            prev_close = close.shift(1)
-            
-            tr1 = high - low
-            tr2 = abs(high - prev_close)
-            tr3 = abs(low - prev_close)
-            
-            tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-            atr = tr.rolling(window=period).mean()
-            return atr
-        except:
-            return pd.Series([0] * len(df))
-
     def calculate_rsi(self, series, period=14):
-        """Manual RSI calculation using Pandas."""
-        delta = series.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs))
+        """Manual RSI calculation (simple rolling means)."""
+        name = f'RSI_SMA_{period}'
+        return indicators.compute(series.to_frame('close'), [name])[name]
 
     def calculate_atr(self, df, period=14):
-        """Manual ATR (Average True Range) calculation."""
-        high_low = df['high'] - df['low']
-        high_close = (df['high'] - df['close'].shift()).abs()
-        low_close = (df['low'] - df['close'].shift()).abs()
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        true_range = ranges.max(axis=1)
-        return true_range.rolling(window=period).mean()
+        """Manual ATR (Average True Range) calculation (simple rolling mean)."""
+        name = f'ATR_SMA_{period}'
+        return indicators.compute(df, [name])[name]
 
     async def get_top_symbols(self, quote_currency='USDT', limit=250):
         """جلب أفضل العملات بناءً على حجم التداول لضمان جودة الإشارات."""
@@ -252,8 +232,9 @@ class MarketScanner:
             if not bars: return None
             
             df = pd.DataFrame(bars, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['RSI'] = self.calculate_rsi(df['close'])
-            df['EMA_20'] = df['close'].ewm(span=20, adjust=False).mean()
+            values = indicators.compute(df, ['RSI_SMA_14', 'EMA_20'])
+            df['RSI'] = values['RSI_SMA_14']
+            df['EMA_20'] = values['EMA_20']
             
             last_price = df['close'].iloc[-1]
             last_rsi = df['RSI'].iloc[-1]
@@ -291,6 +272,35 @@ class MarketScanner:
             logger.error(f"Movers Error: {e}")
             return None
 
+    async def fetch_bars(self, symbol, timeframe='1h', limit=100):
+        """جلب الشموع كـ Candles مضغوطة (أو None عند الفشل)."""
+        try:
+            bars = await self.exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
+            if not bars: return None
+            return Candles.from_ohlcv(bars, symbol, timeframe)
+        except Exception as e:
+            logger.debug(f"Error fetching {symbol}: {e}")
+            return None
+
+    def analyze_many(self, frames):
+        """
+        نفس حسابات analyze_symbol لكل العملات دفعة واحدة (NumPy panel).
+        RSI هنا بالمتوسط البسيط مثل calculate_rsi.
+        """
+        symbols, panel = panel_indicators.stack(frames)
+        if not symbols: return []
+        close = panel['close']
+        last_rsi = panel_indicators.rsi(close, method='sma')[:, -1]
+        last_ema = panel_indicators.ema(close, span=20)[:, -1]
+        last_price = close[:, -1]
+
+        # حساب الزخم (Momentum)
+        momentum = ((last_price - last_ema) / last_ema) * 100
+        return [
+            {'symbol': symbol, 'price': last_price[i], 'rsi': last_rsi[i], 'momentum': momentum[i]}
+            for i, symbol in enumerate(symbols)
+        ]
+
     async def scan(self, quote_currency='USDT'):
         """مسح شامل وفائق السرعة لـ 250 عملة مع تأكيد ذكي."""
         logger.info(f"📡 جاري رصد الفرص في 250 عملة...")
@@ -298,14 +308,35 @@ class MarketScanner:
         
         sem = asyncio.Semaphore(15)
         
-        async def bounded_analyze(symbol):
+        async def bounded_fetch(symbol):
             async with sem:
-                return await self.analyze_symbol(symbol)
+                return await self.fetch_bars(symbol)
 
-        tasks = [bounded_analyze(s) for s in symbols]
+        tasks = [bounded_fetch(s) for s in symbols]
         results = await asyncio.gather(*tasks)
-        opportunities = [r for r in results if r is not None]
+        frames = {s: df for s, df in zip(symbols, results) if df is not None}
+
+        # المؤشرات لكل العملات في تمريرة واحدة
+        opportunities = self.analyze_many(frames)
         
         # ترتيب الفرص حسب الزخم
         opportunities.sort(key=lambda x: x['momentum'], reverse=True)
         return opportunities
+
+    async def leaderboard(self, timeframe='1h', quote_currency='USDT'):
+        """ترتيب الـ 250 عملة بقواعد محلل الذهب في تمريرة واحدة (مخزن حتى إغلاق الشمعة التالية)."""
+        board_cache = self.boards.setdefault(timeframe, Leaderboard(timeframe))
+        symbols = await self.get_top_symbols(quote_currency)
+        board = board_cache.get(symbols)
+        if board is not None:
+            return board
+
+        sem = asyncio.Semaphore(15)
+
+        async def bounded_fetch(symbol):
+            async with sem:
+                return await self.fetch_bars(symbol, timeframe=timeframe, limit=board_cache.limit)
+
+        results = await asyncio.gather(*[bounded_fetch(s) for s in symbols])
+        frames = {s: bars for s, bars in zip(symbols, results) if bars is not None}
+        return board_cache.rank(symbols, frames)
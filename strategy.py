@@ -1,5 +1,28 @@
 import pandas as pd
 import numpy as np
+import panel_indicators
+import indicators
+from candles import as_frame
+from resampler import to_epoch_ms
+from indicator_cache import indicator_cache, cached_ema
+from rules import compile_rule
+
+# Entry conditions (rules.py syntax). Names are indicator columns, strategy
+# parameters, or mtf_bias (BULLISH / BEARISH / NEUTRAL).
+# LONG: 1h uptrend + 4h not bearish + positive MACD + pullback to the lower band
+#       + bullish candle + volume spike
+LONG_RULE = (
+    "close > EMA_200 and mtf_bias != 'BEARISH' and MACD > MACD_Signal"
+    " and low <= `BBL_20_2.0` * 1.01 and close > open"
+    " and volume > Volume_MA * volume_spike_multiplier"
+)
+# SHORT: 1h downtrend + 4h not bullish + negative MACD + upper-band bounce or RSI overbought
+#        + bearish candle + volume spike
+SHORT_RULE = (
+    "close < EMA_200 and mtf_bias != 'BULLISH' and MACD < MACD_Signal"
+    " and (high >= `BBU_20_2.0` * 0.99 or RSI > 70) and close < open"
+    " and volume > Volume_MA * volume_spike_multiplier"
+)
 
 class Strategy:
     def __init__(self):
@@ -12,63 +35,54 @@ class Strategy:
         self.volume_ma_period = 20
         self.volume_spike_multiplier = 1.5 # 50% above average
 
+        # Entry rules (can be replaced with any rules.py expression)
+        self.long_rule = LONG_RULE
+        self.short_rule = SHORT_RULE
+
+    def rule_params(self):
+        """Numeric strategy parameters the rules can refer to by name."""
+        return {k: v for k, v in vars(self).items() if isinstance(v, (int, float))}
+
     def calculate_rsi(self, series, period=14):
-        delta = series.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        
-        rs = gain / loss
-        return 100 - (100 / (1 + rs))
+        name = f'RSI_SMA_{period}'
+        return indicators.compute(series.to_frame('close'), [name])[name]
 
     def apply_indicators(self, df):
         """
         Calculates advanced technical indicators using standard Pandas.
         No external 'ta' library needed.
+        Results for frames from fetch_data are shared through the indicator cache.
+        Also accepts Candles.
         """
-        close = df['close']
-
-        # 1. Trend Filter: EMA 200
-        df['EMA_200'] = close.ewm(span=self.ema_trend_period, adjust=False).mean()
-        
-        # 2. Momentum: MACD (12, 26, 9)
-        k = close.ewm(span=12, adjust=False).mean()
-        d = close.ewm(span=26, adjust=False).mean()
-        df['MACD'] = k - d
-        df['MACD_Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
-        df['MACD_Hist'] = df['MACD'] - df['MACD_Signal']
-        
-        # 3. Volatility: Bollinger Bands (20, 2)
-        sma_20 = close.rolling(window=20).mean()
-        std_20 = close.rolling(window=20).std()
-        df['BBL_20_2.0'] = sma_20 - (2 * std_20)
-        df['BBU_20_2.0'] = sma_20 + (2 * std_20)
-
-        # 4. RSI for extra confirmation
-        # Note: wilder's smoothing is standard for RSI but simple rolling is close enough for this
-        # or we implement wilder's. Let's start with a simple one for robustness.
-        delta = close.diff()
-        gain = (delta.where(delta > 0, 0)).ewm(alpha=1/14, adjust=False).mean()
-        loss = (-delta.where(delta < 0, 0)).ewm(alpha=1/14, adjust=False).mean()
-        rs = gain / loss
-        df['RSI'] = 100 - (100 / (1 + rs))
-
-        # 5. Volatility for Risk Management: ATR (Average True Range)
-        high = df['high']
-        low = df['low']
-        prev_close = close.shift(1)
-        
-        tr1 = high - low
-        tr2 = (high - prev_close).abs()
-        tr3 = (low - prev_close).abs()
-        
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        df['ATR'] = tr.ewm(alpha=1/14, adjust=False).mean()
-
-        # 6. Volume Moving Average
-        df['Volume_MA'] = df['volume'].rolling(window=self.volume_ma_period).mean()
+        df = as_frame(df)
+        return indicator_cache.get_or_compute(
+            df, 'strategy', self._compute_indicators,
+            ema=self.ema_trend_period, volume_ma=self.volume_ma_period,
+        )
 
+    def _compute_indicators(self, df):
+        # Trend (EMA), momentum (MACD, Wilder RSI), volatility (Bollinger Bands, Wilder ATR), volume MA
+        values = indicators.compute(df, [
+            f'EMA_{self.ema_trend_period}', 'MACD', 'MACD_Signal', 'MACD_Hist',
+            'BBL_20_2.0', 'BBU_20_2.0', 'RSI_14', 'ATR_14', f'VOLUME_MA_{self.volume_ma_period}',
+        ])
+        df['EMA_200'] = values[f'EMA_{self.ema_trend_period}']
+        for name in ['MACD', 'MACD_Signal', 'MACD_Hist', 'BBL_20_2.0', 'BBU_20_2.0']:
+            df[name] = values[name]
+        df['RSI'] = values['RSI_14']
+        df['ATR'] = values['ATR_14']
+        df['Volume_MA'] = values[f'VOLUME_MA_{self.volume_ma_period}']
         return df
 
+    def apply_indicators_many(self, frames):
+        """
+        apply_indicators for many symbols at once ({symbol: df} -> {symbol: df}).
+        Uses the NumPy panel kernel: one pass over time for the whole universe.
+        """
+        symbols, panel = panel_indicators.stack(frames)
+        columns = panel_indicators.strategy_indicators(panel, self.ema_trend_period, self.volume_ma_period)
+        return panel_indicators.unstack(frames, symbols, columns)
+
     def check_signal(self, df, df_mtf=None):
         """
         Generates trade signals with Multi-Timeframe (MTF) trend confirmation.
@@ -82,30 +96,15 @@ class Strategy:
         mtf_bias = "NEUTRAL"
         if df_mtf is not None and len(df_mtf) >= self.mtf_trend_period:
             mtf_close = df_mtf.iloc[-1]['close']
-            mtf_ema = df_mtf['close'].ewm(span=self.mtf_trend_period, adjust=False).mean().iloc[-1]
+            mtf_ema = cached_ema(df_mtf, self.mtf_trend_period).iloc[-1]
             mtf_bias = "BULLISH" if mtf_close > mtf_ema else "BEARISH"
             
         signal = "NEUTRAL"
         setup = None
+        params = self.rule_params()
 
         # --- LONG (BUY) STRATEGY ---
-        # 1. 1h Trend is UP
-        is_uptrend = curr['close'] > curr['EMA_200']
-        # 2. 4h Trend confirms (MTF)
-        mtf_confirm_long = (mtf_bias == "BULLISH" or mtf_bias == "NEUTRAL") 
-        # 3. Momentum is Positive
-        is_momentum_up = curr['MACD'] > curr['MACD_Signal']
-        # 4. Pullback Entry
-        is_pullback = curr['low'] <= curr['BBL_20_2.0'] * 1.01
-        
-        # 5. Volume Spike
-        is_volume_spike = curr['volume'] > (curr['Volume_MA'] * self.volume_spike_multiplier)
-        
-        # 6. Candle Close Confirmation (Last candle closed in direction)
-        is_candle_bullish = curr['close'] > curr['open']
-        is_candle_bearish = curr['close'] < curr['open']
-
-        if is_uptrend and mtf_confirm_long and is_momentum_up and is_pullback and is_candle_bullish and is_volume_spike:
+        if compile_rule(self.long_rule).last(df, params, bar=curr, mtf_bias=mtf_bias):
             signal = "BUY"
             stop_loss = curr['close'] - (curr['ATR'] * self.atr_multiplier)
             risk = curr['close'] - stop_loss
@@ -120,18 +119,7 @@ class Strategy:
             }
         
         # --- SHORT (SELL) STRATEGY ---
-        # 1. 1h Trend is DOWN
-        is_downtrend = curr['close'] < curr['EMA_200']
-        # 2. 4h Trend confirms (MTF)
-        mtf_confirm_short = (mtf_bias == "BEARISH" or mtf_bias == "NEUTRAL")
-        # 3. Momentum is Negative
-        is_momentum_down = curr['MACD'] < curr['MACD_Signal']
-        # 4. Bounce from Upper Bollinger Band
-        is_bounce = curr['high'] >= curr['BBU_20_2.0'] * 0.99
-        # 5. RSI Overbought
-        is_overbought = curr['RSI'] > 70
-        
-        if is_downtrend and mtf_confirm_short and is_momentum_down and (is_bounce or is_overbought) and is_candle_bearish and is_volume_spike:
+        if compile_rule(self.short_rule).last(df, params, bar=curr, mtf_bias=mtf_bias):
             signal = "SELL"
             stop_loss = curr['close'] + (curr['ATR'] * self.atr_multiplier)
             risk = stop_loss - curr['close']
@@ -146,3 +134,67 @@ class Strategy:
             }
         
         return signal, setup
+
+    def mtf_bias_series(self, df, df_mtf):
+        """
+        Higher-timeframe bias for every bar of df, as check_signal sees it live at that bar's close:
+        the df_mtf bar containing the bar is still open, so its close is the bar's close and its
+        EMA extends the previous (completed) bar's EMA by that close. The final df_mtf close and
+        EMA are never used before that higher-timeframe bar has closed.
+        """
+        bias = np.full(len(df), "NEUTRAL", dtype=object)
+        if df_mtf is None or len(df_mtf) < self.mtf_trend_period:
+            return bias
+
+        mtf_ema = cached_ema(df_mtf, self.mtf_trend_period).to_numpy()
+        pos = np.searchsorted(to_epoch_ms(df_mtf['timestamp']), to_epoch_ms(df['timestamp']), side='right') - 1
+
+        # Bias needs at least mtf_trend_period higher-timeframe bars up to that point
+        valid = pos >= self.mtf_trend_period - 1
+        idx = pos[valid]
+        close = df['close'].to_numpy(dtype=float)[valid]
+        alpha = 2 / (self.mtf_trend_period + 1)
+        ema = np.where(idx > 0, alpha * close + (1 - alpha) * mtf_ema[np.maximum(idx - 1, 0)], close)
+        bias[valid] = np.where(close > ema, "BULLISH", "BEARISH")
+        return bias
+
+    def generate_signals(self, df, df_mtf=None):
+        """
+        Vectorized check_signal for every bar (df must have apply_indicators columns).
+        Returns a DataFrame aligned with df: signal, mtf_bias, entry, stop_loss, take_profit.
+        The last row equals check_signal(df, df_mtf).
+        """
+        close = df['close']
+        mtf_bias = self.mtf_bias_series(df, df_mtf)
+        params = self.rule_params()
+
+        buy = compile_rule(self.long_rule).mask(df, params, mtf_bias=mtf_bias)
+        sell = compile_rule(self.short_rule).mask(df, params, mtf_bias=mtf_bias)
+
+        # check_signal needs 200 rows of history
+        warm = np.arange(len(df)) >= 199
+        buy = buy & warm
+        sell = sell & warm
+
+        stop_distance = df['ATR'] * self.atr_multiplier
+        stop_loss = np.where(buy, close - stop_distance, np.where(sell, close + stop_distance, np.nan))
+        take_profit = np.where(buy, close + stop_distance * self.risk_reward_ratio,
+                               np.where(sell, close - stop_distance * self.risk_reward_ratio, np.nan))
+
+        return pd.DataFrame({
+            'signal': np.where(sell, "SELL", np.where(buy, "BUY", "NEUTRAL")),
+            'mtf_bias': mtf_bias,
+            'entry': np.where(buy | sell, close, np.nan),
+            'stop_loss': stop_loss,
+            'take_profit': take_profit,
+        }, index=df.index)
+
+
+def make_strategy(params):
+    """Strategy with the given attribute overrides (atr_multiplier, long_rule, ...)."""
+    strategy = Strategy()
+    for name, value in params.items():
+        if not hasattr(strategy, name):
+            raise AttributeError(f"Strategy has no parameter '{name}'")
+        setattr(strategy, name, value)
+    return strategy
@@ -0,0 +1,83 @@
+"""
+=======================================================
+Strategy Runner - Several Strategy Configurations Side by Side
+One fetch and one indicator pass per symbol, N parameter sets on top
+=======================================================
+"""
+
+import time
+import config
+from market_data import BinanceClient
+from resampler import resample, base_limit
+from strategy import make_strategy
+import db_manager as database
+
+
+class StrategyRunner:
+    """
+    Evaluates every configured strategy on the same frames.
+    Strategies whose indicator settings match (ema_trend_period, volume_ma_period)
+    share one apply_indicators result; only check_signal runs per strategy.
+    """
+
+    def __init__(self, client, variants=None, status='PAPER'):
+        self.client = client
+        self.strategies = {sid: make_strategy(params) for sid, params in (variants or config.STRATEGY_VARIANTS).items()}
+        self.status = status  # PAPER: logged for comparison, not picked up by the approval flow
+        self.last_logged = {}  # (strategy_id, symbol) -> candle timestamp of the last logged signal
+
+    def evaluate(self, symbol, df_base):
+        """[(strategy_id, signal, setup)] for one symbol's base-timeframe candles."""
+        if df_base is None or len(df_base) <= 200:
+            return []
+        df = df_base.tail(config.LIMIT).reset_index(drop=True)
+        df_4h = resample(df_base, config.MTF_TIMEFRAME).tail(config.MTF_LIMIT).reset_index(drop=True)
+
+        shared = {}  # indicator settings -> frame with indicators
+        results = []
+        for sid, strategy in self.strategies.items():
+            key = (strategy.ema_trend_period, strategy.volume_ma_period)
+            if key not in shared:
+                # apply_indicators writes into the frame it is given, so each setting gets its own copy
+                shared[key] = strategy.apply_indicators(df.copy())
+            signal, setup = strategy.check_signal(shared[key], df_mtf=df_4h)
+            results.append((sid, signal, setup))
+        return results
+
+    def run_once(self):
+        """Fetches every pair once (concurrently) and logs new signals per strategy."""
+        limit = base_limit(config.TIMEFRAME, config.LIMIT, config.MTF_TIMEFRAME, config.MTF_LIMIT)
+        requests = [(symbol, config.TIMEFRAME, limit) for symbol in config.TARGET_PAIRS]
+        logged = 0
+        for (symbol, _, _), df_base in self.client.fetch_many(requests):
+            for sid, signal, setup in self.evaluate(symbol, df_base):
+                if signal not in ["BUY", "SELL"] or not setup:
+                    continue
+                # One entry per strategy, symbol and candle
+                candle = df_base.iloc[-1]['timestamp']
+                if self.last_logged.get((sid, symbol)) == candle:
+                    continue
+                self.last_logged[(sid, symbol)] = candle
+                database.log_signal(symbol, signal, setup['entry'], setup['stop_loss'], setup['take_profit'],
+                                    setup['reason'], status=self.status, strategy_id=sid)
+                print(f"📝 [{sid}] {signal} {symbol} @ {setup['entry']:.4f}")
+                logged += 1
+        return logged
+
+    def run(self, interval=5):
+        print(f"🧪 Running {len(self.strategies)} strategies on {len(config.TARGET_PAIRS)} pairs: {', '.join(self.strategies)}")
+        while True:
+            started = time.time()
+            logged = self.run_once()
+            print(f"⏱️ Cycle done in {time.time() - started:.2f}s ({logged} new signals). Waiting {interval}s...")
+            time.sleep(interval)
+
+
+if __name__ == "__main__":
+    database.init_db()
+    runner = StrategyRunner(BinanceClient())
+    try:
+        runner.run()
+    except KeyboardInterrupt:
+        print("\nRunner stopped by user.")
+        print(database.get_strategy_summary())
@@ -0,0 +1,186 @@
+"""
+=======================================================
+Market Stream - Binance WebSocket kline/ticker feed
+Live streaming for the bot + local replay server for offline testing
+=======================================================
+"""
+
+import asyncio
+import json
+import time
+import websockets
+
+
+def to_stream_symbol(symbol):
+    """'BTC/USDT' -> 'btcusdt'"""
+    return symbol.replace('/', '').lower()
+
+
+class BinanceStream:
+    """
+    Subscribes to kline and ticker streams for a list of pairs
+    and dispatches closed candles and price ticks to callbacks.
+    """
+
+    def __init__(self, symbols, timeframe, url, record_path=None):
+        self.symbols = symbols
+        self.timeframe = timeframe
+        self.url = url.rstrip('/')
+        self.record_path = record_path
+        self._by_stream_symbol = {to_stream_symbol(s): s for s in symbols}
+        self.running = False
+
+    def build_url(self):
+        streams = []
+        for symbol in self.symbols:
+            s = to_stream_symbol(symbol)
+            streams.append(f"{s}@kline_{self.timeframe}")
+            streams.append(f"{s}@ticker")
+        return f"{self.url}/stream?streams={'/'.join(streams)}"
+
+    def parse(self, raw):
+        """
+        Parses one combined-stream message.
+        Returns ('candle', symbol, ohlcv_row, is_closed), ('tick', symbol, price) or None.
+        """
+        msg = json.loads(raw)
+        data = msg.get('data', msg)
+        event = data.get('e')
+        symbol = self._by_stream_symbol.get(str(data.get('s', '')).lower())
+        if symbol is None:
+            return None
+
+        if event == 'kline':
+            k = data['k']
+            row = [int(k['t']), float(k['o']), float(k['h']), float(k['l']), float(k['c']), float(k['v'])]
+            return ('candle', symbol, row, bool(k['x']))
+        if event in ('24hrTicker', '24hrMiniTicker'):
+            return ('tick', symbol, float(data['c']))
+        return None
+
+    async def run(self, on_candle, on_tick, on_reconnect=None):
+        """
+        Connects and dispatches forever. Reconnects with backoff
+        (Binance drops every connection after 24h).
+        on_candle(symbol, row, is_closed) and on_tick(symbol, price) may be sync or async.
+        """
+        self.running = True
+        backoff = 1
+        record_file = open(self.record_path, 'a', encoding='utf-8') if self.record_path else None
+        try:
+            while self.running:
+                try:
+                    async with websockets.connect(self.build_url(), ping_interval=20) as ws:
+                        print(f"📡 Stream connected ({len(self.symbols)} pairs)")
+                        backoff = 1
+                        if on_reconnect:
+                            await _maybe_await(on_reconnect())
+
+                        async for raw in ws:
+                            if record_file:
+                                record_file.write(json.dumps({'t': time.time(), 'msg': raw}) + '\n')
+
+                            event = self.parse(raw)
+                            if event is None:
+                                continue
+                            if event[0] == 'candle':
+                                await _maybe_await(on_candle(event[1], event[2], event[3]))
+                            else:
+                                await _maybe_await(on_tick(event[1], event[2]))
+                    reason = "closed by server"
+                except (OSError, websockets.WebSocketException) as e:
+                    reason = str(e)
+
+                if not self.running:
+                    break
+                print(f"⚠️ Stream disconnected ({reason}). Reconnecting in {backoff}s...")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+        finally:
+            if record_file:
+                record_file.close()
+
+    def stop(self):
+        self.running = False
+
+
+async def _maybe_await(result):
+    if asyncio.iscoroutine(result):
+        return await result
+    return result
+
+
+# ==========================================================
+# Offline testing: record live messages and replay them locally
+# ==========================================================
+
+async def record(symbols, timeframe, url, path, seconds):
+    """Records raw stream messages to a JSONL file for later replay."""
+    stream = BinanceStream(symbols, timeframe, url, record_path=path)
+    noop = lambda *args: None
+    try:
+        await asyncio.wait_for(stream.run(noop, noop), timeout=seconds)
+    except asyncio.TimeoutError:
+        pass
+    print(f"💾 Recorded {seconds}s of stream data to {path}")
+
+
+class ReplayServer:
+    """
+    Local WebSocket server that plays back a recording made with `record`.
+    Point STREAM_URL at it (e.g. ws://localhost:8765) to run the bot offline.
+    """
+
+    def __init__(self, path, host='localhost', port=8765, speed=1.0, loop=False):
+        self.path = path
+        self.host = host
+        self.port = port
+        self.speed = speed
+        self.loop = loop
+
+    def load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    async def handler(self, ws, *args):
+        entries = self.load()
+        print(f"▶️ Replaying {len(entries)} messages to client (speed x{self.speed})")
+        while True:
+            prev_t = None
+            for entry in entries:
+                if prev_t is not None and self.speed > 0:
+                    await asyncio.sleep(max(0, entry['t'] - prev_t) / self.speed)
+                prev_t = entry['t']
+                await ws.send(entry['msg'])
+            if not self.loop:
+                break
+        await ws.close()
+
+    async def serve(self):
+        async with websockets.serve(self.handler, self.host, self.port):
+            print(f"🎞️ Replay server listening on ws://{self.host}:{self.port}")
+            await asyncio.Future()
+
+
+if __name__ == "__main__":
+    import argparse
+    import config
+
+    parser = argparse.ArgumentParser(description="Record or replay Binance stream data")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    rec = sub.add_parser('record', help="Record live messages to a JSONL file")
+    rec.add_argument('path')
+    rec.add_argument('--seconds', type=int, default=3600)
+
+    rep = sub.add_parser('replay', help="Serve a recording over a local WebSocket")
+    rep.add_argument('path')
+    rep.add_argument('--port', type=int, default=8765)
+    rep.add_argument('--speed', type=float, default=1.0, help="Playback speed (0 = as fast as possible)")
+    rep.add_argument('--loop', action='store_true')
+
+    args = parser.parse_args()
+    if args.command == 'record':
+        asyncio.run(record(config.TARGET_PAIRS, config.TIMEFRAME, config.STREAM_URL, args.path, args.seconds))
+    else:
+        asyncio.run(ReplayServer(args.path, port=args.port, speed=args.speed, loop=args.loop).serve())
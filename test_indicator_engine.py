@@ -0,0 +1,77 @@
+"""
+IndicatorEngine must return what Strategy.apply_indicators computes on the same rows
+(run: python -m pytest -q test_indicator_engine.py)
+"""
+
+import numpy as np
+import pandas as pd
+import indicators
+from indicator_engine import IndicatorEngine, INDICATOR_COLUMNS
+from resampler import to_epoch_ms
+
+HOUR_MS = 3600 * 1000
+WINDOW = 300
+
+
+def make_candles(n, drift=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(drift, 0.01, n)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = close * rng.uniform(0.001, 0.01, n)
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(np.arange(n) * HOUR_MS, unit='ms'),
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': rng.uniform(1, 10, n),
+    })
+
+
+def batch(df):
+    """Strategy._compute_indicators column for column (default periods)."""
+    values = indicators.compute(df, ['EMA_200', 'MACD', 'MACD_Signal', 'MACD_Hist', 'BBL_20_2.0',
+                                     'BBU_20_2.0', 'RSI_14', 'ATR_14', 'VOLUME_MA_20'])
+    return pd.DataFrame({
+        'EMA_200': values['EMA_200'], 'MACD': values['MACD'], 'MACD_Signal': values['MACD_Signal'],
+        'MACD_Hist': values['MACD_Hist'], 'BBL_20_2.0': values['BBL_20_2.0'], 'BBU_20_2.0': values['BBU_20_2.0'],
+        'RSI': values['RSI_14'], 'ATR': values['ATR_14'], 'Volume_MA': values['VOLUME_MA_20'],
+    })
+
+
+def assert_matches(engine_frame, window):
+    expected = batch(window.reset_index(drop=True))
+    for name in INDICATOR_COLUMNS:
+        assert np.allclose(engine_frame[name].to_numpy(), expected[name].to_numpy(), rtol=1e-9, atol=1e-9,
+                           equal_nan=True), name
+
+
+def test_incremental_updates_match_batch_window():
+    for drift in (0.0, 0.004):  # random walk and a strong trend
+        candles = make_candles(WINDOW + 500, drift=drift)
+        engine = IndicatorEngine(history=WINDOW)
+        engine.seed('X/USDT', '1h', candles.iloc[:WINDOW])
+
+        ts = to_epoch_ms(candles['timestamp'])
+        values = candles[['open', 'high', 'low', 'close', 'volume']].to_numpy()
+        for i in range(WINDOW, len(candles)):
+            latest = engine.update('X/USDT', '1h', [ts[i], *values[i]])
+
+        window = candles.iloc[-WINDOW:]
+        assert_matches(engine.frame('X/USDT', '1h', limit=WINDOW), window)
+        expected_last = batch(window.reset_index(drop=True)).iloc[-1]
+        for name in INDICATOR_COLUMNS:
+            assert np.isclose(latest[name], expected_last[name], rtol=1e-9, atol=1e-9, equal_nan=True), name
+
+
+def test_sync_matches_batch_after_live_bar_revisions():
+    candles = make_candles(WINDOW + 50, seed=1)
+    engine = IndicatorEngine(history=WINDOW)
+    for end in range(WINDOW, len(candles) + 1):
+        window = candles.iloc[end - WINDOW:end].reset_index(drop=True)
+        # The still-open candle is revised before it closes
+        live = window.copy()
+        live.loc[len(live) - 1, 'close'] *= 1.002
+        engine.sync('X/USDT', '1h', live)
+        frame = engine.sync('X/USDT', '1h', window)
+    assert_matches(frame, window)